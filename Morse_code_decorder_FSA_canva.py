@@ -1,104 +1,152 @@
+import queue
+import threading
 import tkinter as tk
 from tkinter import messagebox, font as tkfont
 
-# Morse Code dictionary for reference
-morse_code_dict = {
-    '.-': 'A', '-...': 'B', '-.-.': 'C', '-..': 'D', '.': 'E', '..-.': 'F', '--.': 'G',
-    '....': 'H', '..': 'I', '.---': 'J', '-.-': 'K', '.-..': 'L', '--': 'M', '-.': 'N',
-    '---': 'O', '.--.': 'P', '--.-': 'Q', '.-.': 'R', '...': 'S', '-': 'T', '..-': 'U',
-    '...-': 'V', '.--': 'W', '-..-': 'X', '-.--': 'Y', '--..': 'Z', '-----': '0',
-    '.----': '1', '..---': '2', '...--': '3', '....-': '4', '.....': '5', '-....': '6',
-    '--...': '7', '---..': '8', '----.': '9'
-}
-
-class PDAMorseDecoder:
-    def __init__(self, display_callback, update_stack_visual, update_letter_stack_visual, update_state_visual):
-        self.stack = []
-        self.letter_stack = []
-        self.decoded_message = ""
-        self.morse_code_sequence = ""
-        self.current_index = 0
-        self.current_state = "START"
-        self.display_callback = display_callback
-        self.update_stack_visual = update_stack_visual
-        self.update_letter_stack_visual = update_letter_stack_visual
-        self.update_state_visual = update_state_visual
-
-    def set_input(self, morse_code_sequence):
-        self.morse_code_sequence = morse_code_sequence.strip()
-        self.current_index = 0
-        self.decoded_message = ""
-        self.stack = []
-        self.letter_stack = []
-        self.current_state = "START"
-        self.display_callback("Ready to decode. Press 'Step' or 'Decode All'.")
-        self.update_stack_visual(self.stack)
-        self.update_letter_stack_visual(self.letter_stack)
-        self.update_state_visual(self.current_state)
-
-    def step_decode(self):
-        if self.current_index >= len(self.morse_code_sequence):
-            if self.stack:
-                decoded_char = self.decode_stack()
-                self.decoded_message += decoded_char
-                self.letter_stack.append(decoded_char)
-                self.update_letter_stack_visual(self.letter_stack)
-            self.current_state = "END"
-            self.display_callback("End of sequence reached.")
-            self.update_stack_visual(self.stack)
-            self.update_state_visual(self.current_state)
+from morse_core.pda_canvas import PDAMorseDecoder
+from morse_core.replay import ExecutionTrace
+from morse_core.trace import FRAME_INTERVAL, TRACE_FULL, TRACE_LEVELS
+
+# Worker thread events are applied to the canvases at most once per frame
+FRAME_MS = 16
+
+SYMBOL_FONT = ('Helvetica', 18, 'bold')
+SYMBOL_SPACING = 20
+
+class StackView:
+    # Stack drawn top first from the left edge of its canvas. Only the top
+    # symbols that fit get canvas items; deeper ones are summarised as "+n".
+    # A push moves the drawn symbols one slot right and adds one item, and
+    # decoding a letter deletes them, so no step redraws the whole stack.
+    TAG = 'symbol'
+
+    def __init__(self, canvas, width, y=50, color='lime'):
+        self.canvas = canvas
+        self.y = y
+        self.color = color
+        self.capacity = (width - 60) // SYMBOL_SPACING
+        self.items = []
+        self.symbols = ()
+        self.length = 0
+        self.more = canvas.create_text(width - 25, y, text='', fill=color, font=('Helvetica', 12))
+
+    def update(self, stack):
+        top = tuple(reversed(stack[-self.capacity:]))
+        canvas = self.canvas
+        if len(stack) == self.length + 1 and top[1:] == self.symbols[:len(top) - 1]:
+            canvas.move(self.TAG, SYMBOL_SPACING, 0)
+            self.items.insert(0, canvas.create_text(
+                20, self.y, text=top[0], fill=self.color, font=SYMBOL_FONT, tags=self.TAG))
+            if len(self.items) > self.capacity:
+                canvas.delete(self.items.pop())
+        elif top != self.symbols:
+            canvas.delete(self.TAG)
+            self.items = [
+                canvas.create_text(20 + SYMBOL_SPACING * slot, self.y, text=symbol, fill=self.color,
+                                   font=SYMBOL_FONT, tags=self.TAG)
+                for slot, symbol in enumerate(top)
+            ]
+        self.symbols = top
+        if len(stack) != self.length:
+            hidden = len(stack) - len(top)
+            canvas.itemconfig(self.more, text=f'+{hidden}' if hidden else '')
+            self.length = len(stack)
+
+    def clear(self):
+        self.update([])
+
+class LetterTapeView:
+    # Decoded letters as a tape that only draws the window of letters that
+    # fits on the canvas. While the window follows the end of the tape, new
+    # letters scroll it left by moving the drawn items and adding the new ones;
+    # scrolling back (scrollbar or mouse wheel) redraws just the window, and
+    # scrolling to the end follows new letters again.
+    TAG = 'letter'
+
+    def __init__(self, canvas, width, scrollbar=None, y=50, color='cyan'):
+        self.canvas = canvas
+        self.scrollbar = scrollbar
+        self.y = y
+        self.color = color
+        self.capacity = (width - 20) // SYMBOL_SPACING
+        self.letters = []
+        self.length = 0
+        self.first = 0
+        self.items = []
+        self.follow = True
+
+    def draw_letter(self, slot, letter):
+        return self.canvas.create_text(20 + SYMBOL_SPACING * slot, self.y, text=letter, fill=self.color,
+                                       font=SYMBOL_FONT, tags=self.TAG)
+
+    def redraw(self):
+        self.canvas.delete(self.TAG)
+        window = self.letters[self.first:self.first + self.capacity]
+        self.items = [self.draw_letter(slot, letter) for slot, letter in enumerate(window)]
+        self.update_scrollbar()
+
+    def update(self, letters):
+        # `letters` is usually the decoder's own letter_stack; when it is the
+        # same list as last time and has only grown, just the new letters are drawn
+        appended = len(letters) - self.length
+        same_tape = letters is self.letters and appended >= 0
+        self.letters = letters
+        self.length = len(letters)
+        if not same_tape:
+            if self.follow or self.first > self.length:
+                self.first = max(0, self.length - self.capacity)
+            self.redraw()
             return
+        if not appended or not self.follow:
+            self.update_scrollbar()
+            return
+        first = max(0, self.length - self.capacity)
+        shift = first - self.first
+        if shift >= self.capacity:
+            self.first = first
+            self.redraw()
+            return
+        canvas = self.canvas
+        if shift:
+            canvas.move(self.TAG, -SYMBOL_SPACING * shift, 0)
+            for item in self.items[:shift]:
+                canvas.delete(item)
+            del self.items[:shift]
+        self.first = first
+        for position in range(self.length - appended, self.length):
+            self.items.append(self.draw_letter(position - first, letters[position]))
+        self.update_scrollbar()
+
+    def scroll_to(self, first):
+        last_first = max(0, self.length - self.capacity)
+        first = max(0, min(int(first), last_first))
+        self.follow = first == last_first
+        if first != self.first:
+            self.first = first
+            self.redraw()
+        else:
+            self.update_scrollbar()
+
+    def scroll(self, *args):
+        # Scrollbar command: ('moveto', fraction) or ('scroll', count, 'units'|'pages')
+        if args[0] == 'moveto':
+            self.scroll_to(float(args[1]) * self.length)
+        elif args[0] == 'scroll':
+            step = self.capacity if args[2] == 'pages' else 1
+            self.scroll_to(self.first + int(args[1]) * step)
 
-        symbol = self.morse_code_sequence[self.current_index]
-        self.current_index += 1
-
-        if symbol in '.-':
-            self.stack.append(symbol)
-            self.current_state = "READ_SYMBOL"
-            action = 'Push'
-        elif symbol == ' ':
-            if self.stack:
-                decoded_char = self.decode_stack()
-                self.decoded_message += decoded_char
-                self.letter_stack.append(decoded_char)
-                self.update_letter_stack_visual(self.letter_stack)
-            self.current_state = "SPACE"
-            action = 'Space'
-        elif symbol == '/':
-            if self.stack:
-                decoded_char = self.decode_stack()
-                self.decoded_message += decoded_char
-                self.letter_stack.append(decoded_char)
-                self.update_letter_stack_visual(self.letter_stack)
-            self.decoded_message += ' '
-            self.letter_stack.append(' ')
-            self.current_state = "SLASH"
-            self.update_letter_stack_visual(self.letter_stack)
-            action = 'Slash'
+    def update_scrollbar(self):
+        if self.scrollbar is None:
+            return
+        if self.length <= self.capacity:
+            self.scrollbar.set(0.0, 1.0)
         else:
-            action = 'Invalid'
-            symbol = f"Invalid symbol '{symbol}' ignored"
-            self.current_state = "ERROR"
-
-        self.display_callback(f"Action: {action} | Symbol: {symbol}")
-        self.update_stack_visual(self.stack)
-        self.update_state_visual(self.current_state)
-
-    def decode_stack(self):
-        if not self.stack:
-            return ""
-        morse_char = ''.join(self.stack)
-        self.stack = []
-        decoded_char = morse_code_dict.get(morse_char, '?')
-        self.current_state = "DECODE"
-        self.display_callback(f"Decoded: {decoded_char} from {morse_char}")
-        self.update_stack_visual(self.stack)
-        self.update_state_visual(self.current_state)
-        return decoded_char
-
-    def decode_all(self):
-        while self.current_index < len(self.morse_code_sequence):
-            self.step_decode()
+            self.scrollbar.set(self.first / self.length, min(1.0, (self.first + self.capacity) / self.length))
+
+    def clear(self):
+        self.update([])
+        self.follow = True
+
 
 class MorseCodeApp:
     def __init__(self, root):
@@ -127,17 +175,46 @@ class MorseCodeApp:
         reset_button = tk.Button(button_frame, text="Reset", font=text_font, command=self.reset)
         reset_button.grid(row=0, column=2, padx=10)
 
+        cancel_button = tk.Button(button_frame, text="Cancel", font=text_font, command=self.handle_cancel)
+        cancel_button.grid(row=0, column=3, padx=10)
+
+        # Trace level: off, summary (decoded letters) or full (every symbol)
+        self.trace_level = tk.StringVar(value=TRACE_FULL)
+        trace_menu = tk.OptionMenu(button_frame, self.trace_level, *TRACE_LEVELS)
+        trace_menu.grid(row=0, column=4, padx=10)
+
+        # Replay: step back or scrub to any step of the current input
+        replay_frame = tk.Frame(root, bg='black')
+        replay_frame.pack(pady=10)
+
+        back_button = tk.Button(replay_frame, text="Back", font=text_font, command=self.handle_back)
+        back_button.grid(row=0, column=0, padx=10)
+
+        self.step_scale = tk.Scale(replay_frame, from_=0, to=0, orient=tk.HORIZONTAL, length=600, label="Step",
+                                   font=text_font, bg='black', fg='lime', highlightthickness=0,
+                                   command=self.handle_scrub)
+        self.step_scale.grid(row=0, column=1, padx=10)
+
         self.output_text = tk.Text(root, height=10, width=100, font=text_font, bg='black', fg='white', wrap=tk.WORD)
         self.output_text.pack(pady=10)
 
         self.stack_canvas = tk.Canvas(root, width=400, height=100, bg='black')
         self.stack_canvas.pack(pady=10)
+        self.stack_view = StackView(self.stack_canvas, 400)
 
         self.letter_stack_canvas = tk.Canvas(root, width=800, height=100, bg='black')
-        self.letter_stack_canvas.pack(pady=10)
+        self.letter_stack_canvas.pack(pady=(10, 0))
+        letter_scrollbar = tk.Scrollbar(root, orient=tk.HORIZONTAL)
+        letter_scrollbar.pack(fill=tk.X, padx=20, pady=(0, 10))
+        self.letter_view = LetterTapeView(self.letter_stack_canvas, 800, letter_scrollbar)
+        letter_scrollbar.config(command=self.letter_view.scroll)
+        self.letter_stack_canvas.bind('<MouseWheel>', self.handle_letter_wheel)
+        self.letter_stack_canvas.bind('<Button-4>', self.handle_letter_wheel)
+        self.letter_stack_canvas.bind('<Button-5>', self.handle_letter_wheel)
 
         self.state_canvas = tk.Canvas(root, width=800, height=50, bg='black')
         self.state_canvas.pack(pady=10)
+        self.state_item = self.state_canvas.create_text(400, 25, text='', fill="yellow", font=SYMBOL_FONT)
 
         self.pda_decoder = PDAMorseDecoder(
             self.display_message,
@@ -146,31 +223,145 @@ class MorseCodeApp:
             self.update_state_visual
         )
 
+        # Decode All runs on a worker thread; set cancel_event to stop it
+        self.worker = None
+        self.cancel_event = threading.Event()
+
+        # Recorded run of the current input, and the step the decoder is at
+        self.execution = None
+        self.step = 0
+
+    def start_input(self):
+        self.reset_output()
+        self.pda_decoder.set_input(self.input_text.get())
+        self.execution = ExecutionTrace(self.pda_decoder)
+        self.step = 0
+        self.step_scale.config(to=self.execution.final_step)
+        self.step_scale.set(0)
+
     def handle_step(self):
+        self.cancel_decode()
         if not self.input_text.get():
             messagebox.showinfo("Error", "Please enter Morse code.")
             return
         if not self.pda_decoder.morse_code_sequence:
-            self.reset_output()
-            self.pda_decoder.set_input(self.input_text.get())
+            self.start_input()
+        self.pda_decoder.trace_level = self.trace_level.get()
         self.pda_decoder.step_decode()
+        self.step = min(self.step + 1, self.execution.final_step)
+        self.step_scale.set(self.step)
+
+    def handle_back(self):
+        self.seek(self.step - 1)
+
+    def handle_scrub(self, value):
+        # Also called when the scale is moved by set(); only act on new steps
+        if int(value) != self.step:
+            self.seek(int(value))
+
+    def seek(self, step):
+        # Jump to a step through the recorded trace instead of re-running
+        self.cancel_decode()
+        if self.execution is None:
+            return
+        self.step = self.execution.seek(self.pda_decoder, step)
+        self.step_scale.set(self.step)
+        self.pda_decoder.trace.add(f"Replayed to step {self.step} of {self.execution.final_step}.")
+        self.pda_decoder.refresh(force=True)
 
     def handle_decode_all(self):
         if not self.input_text.get():
             messagebox.showinfo("Error", "Please enter Morse code.")
             return
+        if self.worker is not None:
+            return
         if not self.pda_decoder.morse_code_sequence:
-            self.reset_output()
-            self.pda_decoder.set_input(self.input_text.get())
-        self.pda_decoder.decode_all()
+            self.start_input()
+
+        # While the worker owns the decoder its callbacks only queue events,
+        # and poll_events applies the latest of each kind once per frame
+        events = queue.Queue()
+        decoder = self.pda_decoder
+        decoder.display_callback = lambda message: events.put(('message', message))
+        decoder.update_stack_visual = lambda stack: events.put(('stack', list(stack)))
+        decoder.update_letter_stack_visual = lambda letter_stack: events.put(('letters', None))
+        decoder.update_state_visual = lambda state: events.put(('state', state))
+        decoder.trace_level = self.trace_level.get()
+        decoder.trace.interval = FRAME_INTERVAL
+        self.cancel_event = threading.Event()
+        self.worker = threading.Thread(target=self.run_decode_all, args=(decoder, events, self.cancel_event), daemon=True)
+        self.worker.start()
+        self.root.after(FRAME_MS, self.poll_events, self.worker, events)
+
+    def run_decode_all(self, decoder, events, cancel_event):
+        decoder.decode_all(cancel_event)
+        events.put(('done', None))
+
+    def poll_events(self, worker, events):
+        if worker is not self.worker:
+            return
+        messages = []
+        stack = letters_changed = state = None
+        done = False
+        while True:
+            try:
+                kind, value = events.get_nowait()
+            except queue.Empty:
+                break
+            if kind == 'message':
+                messages.append(value)
+            elif kind == 'stack':
+                stack = value
+            elif kind == 'letters':
+                letters_changed = True
+            elif kind == 'state':
+                state = value
+            else:
+                done = True
+        if messages:
+            self.display_message("\n".join(messages))
+        if stack is not None:
+            self.update_stack_visual(stack)
+        if letters_changed:
+            self.update_letter_stack_visual(self.pda_decoder.letter_stack)
+        if state is not None:
+            self.update_state_visual(state)
+        if done:
+            self.finish_worker()
+        else:
+            self.root.after(FRAME_MS, self.poll_events, worker, events)
+
+    def finish_worker(self):
+        # Hand the decoder's callbacks back to the widgets
+        self.worker = None
+        self.step = self.pda_decoder.current_index
+        self.step_scale.set(self.step)
+        self.pda_decoder.trace.interval = 0.0
+        self.pda_decoder.display_callback = self.display_message
+        self.pda_decoder.update_stack_visual = self.update_stack_visual
+        self.pda_decoder.update_letter_stack_visual = self.update_letter_stack_visual
+        self.pda_decoder.update_state_visual = self.update_state_visual
+
+    def handle_cancel(self):
+        # Stop the running Decode All but keep showing what it produced
+        self.cancel_event.set()
+
+    def cancel_decode(self):
+        # Stop a running Decode All and wait for it, dropping unshown output;
+        # the worker stops at its next step, so the join is short
+        if self.worker is None:
+            return
+        self.cancel_event.set()
+        self.worker.join()
+        self.finish_worker()
 
     def reset_output(self):
         self.output_text.config(state="normal")
         self.output_text.delete(1.0, tk.END)
         self.output_text.config(state="disabled")
-        self.stack_canvas.delete("all")
-        self.letter_stack_canvas.delete("all")
-        self.state_canvas.delete("all")
+        self.stack_view.clear()
+        self.letter_view.clear()
+        self.state_canvas.itemconfig(self.state_item, text='')
 
     def display_message(self, message):
         self.output_text.config(state="normal")
@@ -178,29 +369,33 @@ class MorseCodeApp:
         self.output_text.config(state="disabled")
 
     def update_stack_visual(self, stack):
-        self.stack_canvas.delete("all")
-        x, y = 20, 50
-        for symbol in reversed(stack):
-            self.stack_canvas.create_text(x, y, text=symbol, fill="lime", font=('Helvetica', 18, 'bold'))
-            x += 20
+        self.stack_view.update(stack)
 
     def update_letter_stack_visual(self, letter_stack):
-        self.letter_stack_canvas.delete("all")
-        x, y = 20, 50
-        for letter in letter_stack:
-            self.letter_stack_canvas.create_text(x, y, text=letter, fill="cyan", font=('Helvetica', 18, 'bold'))
-            x += 20
+        self.letter_view.update(letter_stack)
 
     def update_state_visual(self, state):
-        self.state_canvas.delete("all")
-        self.state_canvas.create_text(400, 25, text=f"Current State: {state}", fill="yellow", font=('Helvetica', 18, 'bold'))
+        self.state_canvas.itemconfig(self.state_item, text=f"Current State: {state}")
+
+    def handle_letter_wheel(self, event):
+        # Windows/macOS report a delta, X11 sends buttons 4 and 5
+        if event.num == 4 or event.delta > 0:
+            self.letter_view.scroll('scroll', -3, 'units')
+        else:
+            self.letter_view.scroll('scroll', 3, 'units')
 
     def reset(self):
+        self.cancel_decode()
         self.input_text.delete(0, tk.END)
         self.reset_output()
         self.pda_decoder.set_input("")
+        self.execution = None
+        self.step = 0
+        self.step_scale.config(to=0)
+        self.step_scale.set(0)
 
 # Main Application
-root = tk.Tk()
-app = MorseCodeApp(root)
-root.mainloop()
+if __name__ == "__main__":
+    root = tk.Tk()
+    app = MorseCodeApp(root)
+    root.mainloop()
@@ -1,85 +1,14 @@
+import queue
+import threading
 import tkinter as tk
 from tkinter import messagebox
 
-# Morse Code dictionary for reference
-morse_code_dict = {
-    '.-': 'A', '-...': 'B', '-.-.': 'C', '-..': 'D', '.': 'E', '..-.': 'F', '--.': 'G',
-    '....': 'H', '..': 'I', '.---': 'J', '-.-': 'K', '.-..': 'L', '--': 'M', '-.': 'N',
-    '---': 'O', '.--.': 'P', '--.-': 'Q', '.-.': 'R', '...': 'S', '-': 'T', '..-': 'U',
-    '...-': 'V', '.--': 'W', '-..-': 'X', '-.--': 'Y', '--..': 'Z', '-----': '0',
-    '.----': '1', '..---': '2', '...--': '3', '....-': '4', '.....': '5', '-....': '6',
-    '--...': '7', '---..': '8', '----.': '9'
-}
-
-class PDAMorseDecoder:
-    def __init__(self, display_callback, stack_callback):
-        self.stack = []
-        self.current_state = 'START'
-        self.display_callback = display_callback
-        self.update_stack_visual = stack_callback
-        self.decoded_message = ""
-        self.current_index = 0
-        self.morse_code_sequence = ""
-    
-    def set_input(self, morse_code_sequence):
-        # Initialize or reset PDA state and input sequence
-        self.morse_code_sequence = morse_code_sequence
-        self.current_index = 0
-        self.decoded_message = ""
-        self.stack.clear()
-        self.current_state = 'START'
-        self.display_callback("Ready to decode. Press 'Step' or 'Decode All'.")
-        self.update_stack_visual(self.stack)
-    
-    def step_decode(self):
-        # Process one symbol at a time and show its effect on the PDA
-        if self.current_index >= len(self.morse_code_sequence):
-            self.display_callback("End of sequence reached.")
-            return
+from morse_core.pda import PDAMorseDecoder
+from morse_core.replay import ExecutionTrace
+from morse_core.trace import FRAME_INTERVAL, TRACE_FULL, TRACE_LEVELS
 
-        symbol = self.morse_code_sequence[self.current_index]
-        self.current_index += 1
-
-        if symbol == '.' or symbol == '-':
-            # Push . or - to the stack
-            self.stack.append(symbol)
-            self.visualize('Push', symbol)
-        elif symbol == ' ':
-            # A space signifies the end of a letter; decode the letter
-            self.decoded_message += self.decode_stack()
-            self.visualize('Space', 'Decode')
-        elif symbol == '/':
-            # A slash signifies the end of a word; decode and add space
-            self.decoded_message += self.decode_stack() + " "
-            self.visualize('Slash', 'New Word')
-        
-        self.update_stack_visual(self.stack)
-    
-    def decode_all(self):
-        # Decode the entire Morse sequence at once
-        while self.current_index < len(self.morse_code_sequence):
-            self.step_decode()
-        
-        # Final decode of any remaining content in the stack
-        if self.stack:
-            self.decoded_message += self.decode_stack()
-        
-        self.display_callback(f"Final Decoded Message: {self.decoded_message.strip()}")
-    
-    def decode_stack(self):
-        # Decode the Morse sequence in the stack into an English character
-        if not self.stack:
-            return ""
-        
-        morse_char = ''.join(self.stack)
-        self.stack.clear()  # Clear stack after decoding
-        decoded_char = morse_code_dict.get(morse_char, '?')  # Use '?' if character not found
-        self.visualize('Decode', decoded_char)
-        return decoded_char
-    
-    def visualize(self, action, detail):
-        # Show detailed actions taken by the PDA in the output
-        self.display_callback(f"Action: {action} | Detail: {detail} | Stack: {self.stack} | State: {self.current_state}")
+# Worker thread events are applied to the widgets at most once per frame
+FRAME_MS = 16
 
 # GUI Application        
 class MorseCodeApp:
@@ -107,6 +36,25 @@ class MorseCodeApp:
         
         reset_button = tk.Button(button_frame, text="Reset", command=self.reset)
         reset_button.grid(row=0, column=2, padx=5)
+
+        cancel_button = tk.Button(button_frame, text="Cancel", command=self.handle_cancel)
+        cancel_button.grid(row=0, column=3, padx=5)
+
+        # Trace level: off, summary (decoded letters) or full (every symbol)
+        self.trace_level = tk.StringVar(value=TRACE_FULL)
+        trace_menu = tk.OptionMenu(button_frame, self.trace_level, *TRACE_LEVELS)
+        trace_menu.grid(row=0, column=4, padx=5)
+
+        # Replay: step back or scrub to any step of the current input
+        replay_frame = tk.Frame(root)
+        replay_frame.pack(pady=5)
+
+        back_button = tk.Button(replay_frame, text="Back", command=self.handle_back)
+        back_button.grid(row=0, column=0, padx=5)
+
+        self.step_scale = tk.Scale(replay_frame, from_=0, to=0, orient=tk.HORIZONTAL, length=400,
+                                   label="Step", command=self.handle_scrub)
+        self.step_scale.grid(row=0, column=1, padx=5)
         
         # PDA Visualization Area
         self.output_text = tk.Text(root, width=50, height=10, state="disabled")
@@ -131,26 +79,140 @@ class MorseCodeApp:
         # Initialize PDA decoder
         self.pda_decoder = PDAMorseDecoder(self.display_message, self.update_stack_display)
 
+        # Decode All runs on a worker thread; set cancel_event to stop it
+        self.worker_decoder = None
+        self.cancel_event = threading.Event()
+
+        # Recorded run of the current input, and the step the decoder is at
+        self.execution = None
+        self.step = 0
+
     def handle_step(self):
-        # Ensure input is set and output is reset
-        self.initialize_input()
+        self.cancel_decode()
+        # Start over when the input has changed, otherwise keep stepping on
+        if self.execution is None or self.pda_decoder.morse_code_sequence != self.input_text.get():
+            if not self.initialize_input():
+                return
+        self.pda_decoder.trace_level = self.trace_level.get()
         # Trigger single step decode in PDA
         self.pda_decoder.step_decode()
+        self.step = min(self.step + 1, self.execution.final_step)
+        self.step_scale.set(self.step)
+
+    def handle_back(self):
+        self.seek(self.step - 1)
+
+    def handle_scrub(self, value):
+        # Also called when the scale is moved by set(); only act on new steps
+        if int(value) != self.step:
+            self.seek(int(value))
+
+    def seek(self, step):
+        # Jump to a step through the recorded trace instead of re-running
+        self.cancel_decode()
+        if self.execution is None:
+            return
+        self.step = self.execution.seek(self.pda_decoder, step)
+        self.step_scale.set(self.step)
+        self.pda_decoder.trace.add(f"Replayed to step {self.step} of {self.execution.final_step}.")
+        self.pda_decoder.refresh(force=True)
 
     def handle_decode_all(self):
-        # Ensure input is set and output is reset
-        self.initialize_input()
-        # Trigger full sequence decode in PDA
-        self.pda_decoder.decode_all()
+        morse_code = self.input_text.get()
+        if not morse_code:
+            messagebox.showerror("Error", "Please enter Morse code.")
+            return
+        self.cancel_decode()
+        self.reset_output()
+
+        # Decode on a worker thread so the window stays responsive. The worker's
+        # decoder only queues events, and poll_events applies them per frame.
+        events = queue.Queue()
+        decoder = PDAMorseDecoder(
+            lambda message: events.put(('message', message)),
+            lambda stack: events.put(('stack', list(stack))),
+            self.trace_level.get(),
+            FRAME_INTERVAL
+        )
+        self.worker_decoder = decoder
+        self.cancel_event = threading.Event()
+        worker = threading.Thread(
+            target=self.run_decode_all, args=(decoder, morse_code, events, self.cancel_event), daemon=True
+        )
+        worker.start()
+        self.root.after(FRAME_MS, self.poll_events, decoder, events)
+
+    def run_decode_all(self, decoder, morse_code, events, cancel_event):
+        decoder.set_input(morse_code)
+        decoder.decode_all(cancel_event)
+        events.put(('done', None))
+
+    def poll_events(self, decoder, events):
+        # Drain everything queued since the last frame into one widget update
+        if decoder is not self.worker_decoder:
+            return
+        messages = []
+        stack = None
+        done = False
+        while True:
+            try:
+                kind, value = events.get_nowait()
+            except queue.Empty:
+                break
+            if kind == 'message':
+                messages.append(value)
+            elif kind == 'stack':
+                stack = value
+            else:
+                done = True
+        if messages:
+            self.show_messages(messages, decoder.decoded_message)
+        if stack is not None:
+            self.update_stack_display(stack)
+        if done:
+            self.worker_decoder = None
+            self.finish_decode_all(decoder)
+        else:
+            self.root.after(FRAME_MS, self.poll_events, decoder, events)
+
+    def finish_decode_all(self, decoder):
+        # Carry where the worker stopped over to the stepping decoder and the
+        # replay slider, so Step, Back and scrubbing go on from the shown output
+        self.pda_decoder.trace_level = self.trace_level.get()
+        self.pda_decoder.morse_code_sequence = decoder.morse_code_sequence
+        self.pda_decoder.restore(decoder.snapshot())
+        self.execution = ExecutionTrace(self.pda_decoder)
+        # A finished run has also closed the last letter, like the end step
+        if self.pda_decoder.current_index == len(self.pda_decoder.morse_code_sequence):
+            self.step = self.execution.final_step
+        else:
+            self.step = self.pda_decoder.current_index
+        self.step_scale.config(to=self.execution.final_step)
+        self.step_scale.set(self.step)
+
+    def handle_cancel(self):
+        # Stop the running Decode All but keep showing what it produced
+        self.cancel_event.set()
+
+    def cancel_decode(self):
+        # Stop a running Decode All and drop any output it has not shown yet
+        self.cancel_event.set()
+        self.worker_decoder = None
 
     def initialize_input(self):
         # Reset output and initialize PDA with new input
         morse_code = self.input_text.get()
         if not morse_code:
             messagebox.showerror("Error", "Please enter Morse code.")
-            return
+            return False
         self.reset_output()
+        self.pda_decoder.trace_level = self.trace_level.get()
         self.pda_decoder.set_input(morse_code)
+        self.execution = ExecutionTrace(self.pda_decoder)
+        self.step = 0
+        self.step_scale.config(to=self.execution.final_step)
+        self.step_scale.set(0)
+        return True
 
     def reset_output(self):
         # Clear output and stack displays
@@ -168,12 +230,15 @@ class MorseCodeApp:
 
     def display_message(self, message):
         # Update the output box with each message
+        self.show_messages([message], self.pda_decoder.decoded_message)
+
+    def show_messages(self, messages, decoded_message):
         self.output_text.config(state="normal")
-        self.output_text.insert(tk.END, message + "\n")
+        self.output_text.insert(tk.END, "\n".join(messages) + "\n")
         self.output_text.config(state="disabled")
         self.final_message_display.config(state="normal")
         self.final_message_display.delete(1.0, tk.END)
-        self.final_message_display.insert(tk.END, self.pda_decoder.decoded_message.strip())
+        self.final_message_display.insert(tk.END, decoded_message.strip())
         self.final_message_display.config(state="disabled")
     
     def update_stack_display(self, stack):
@@ -186,13 +251,19 @@ class MorseCodeApp:
 
     def reset(self):
         # Reset input, output, and stack displays
+        self.cancel_decode()
         self.input_text.delete(0, tk.END)
         self.reset_output()
+        self.execution = None
+        self.step = 0
+        self.step_scale.config(to=0)
+        self.step_scale.set(0)
 
 # Main Application
-root = tk.Tk()
-app = MorseCodeApp(root)
-root.mainloop()
+if __name__ == "__main__":
+    root = tk.Tk()
+    app = MorseCodeApp(root)
+    root.mainloop()
 
 
 
@@ -1,117 +1,24 @@
+import queue
+import threading
 import tkinter as tk
 from tkinter import messagebox
-import graphviz
-from PIL import Image, ImageTk
-
-class MorseDecoderFSA:
-    def __init__(self):
-        self.state = 'START'
-        self.current_morse = ''
-        self.decoded_message = []
-        self.morse_to_letter = {
-            '.-': 'A', '-...': 'B', '-.-.': 'C', '-..': 'D', '.': 'E',
-            '..-.': 'F', '--.': 'G', '....': 'H', '..': 'I', '.---': 'J',
-            '-.-': 'K', '.-..': 'L', '--': 'M', '-.': 'N', '---': 'O',
-            '.--.': 'P', '--.-': 'Q', '.-.': 'R', '...': 'S', '-': 'T',
-            '..-': 'U', '...-': 'V', '.--': 'W', '-..-': 'X', '-.--': 'Y',
-            '--..': 'Z', '.----': '1', '..---': '2', '...--': '3', '....-': '4',
-            '.....': '5', '-....': '6', '--...': '7', '---..': '8', '----.': '9',
-            '-----': '0'
-        }
-
-    def transition(self, symbol):
-        if symbol == '.':
-            self.current_morse += symbol
-            self.state = 'DOT'
-        elif symbol == '-':
-            self.current_morse += symbol
-            self.state = 'DASH'
-        elif symbol == ' ':
-            if self.current_morse:
-                self.decode_current_morse()
-            self.state = 'START'
-        elif symbol == '/':
-            if self.current_morse:
-                self.decode_current_morse()
-            self.decoded_message.append(' ')
-            self.state = 'START'
-
-    def decode_current_morse(self):
-        if self.current_morse in self.morse_to_letter:
-            self.decoded_message.append(self.morse_to_letter[self.current_morse])
-        self.current_morse = ''
-
-    def decode(self, morse_code):
-        self.decoded_message = []
-        self.current_morse = ''
-        for symbol in morse_code:
-            self.transition(symbol)
-        if self.current_morse:
-            self.decode_current_morse()
-        return ''.join(self.decoded_message)
-
-    def generate_finite_state_diagram(self, morse_code=None):
-        dot = graphviz.Digraph(comment='Morse Decoder FSA')
-        dot.attr(rankdir='LR')
-
-        # Start node
-        dot.node('START', 'START', shape='circle', style='filled', fillcolor='lightblue')
-
-        # Track edges to avoid duplicates
-        edges = set()
-        path_followed = []
-
-        # Generate FSA structure
-        for morse_code_key, letter in self.morse_to_letter.items():
-            current_state = 'START'
-            path = ''
-            for symbol in morse_code_key:
-                path += symbol
-                next_state = f'{path}'
-
-                # Add node and edge
-                if (current_state, next_state, symbol) not in edges:
-                    dot.node(next_state, f'{path} ({symbol})')
-                    dot.edge(current_state, next_state, label=symbol, color='black')
-                    edges.add((current_state, next_state, symbol))
-
-                current_state = next_state
-
-            # Final node for the decoded letter
-            final_state = f'{current_state}_decoded'
-            dot.node(final_state, f'{letter}', shape='doublecircle', style='filled', fillcolor='yellow')
-            dot.edge(current_state, final_state, label=f'Decode: {letter}', color='black')
-
-        # Add the path followed if morse_code is provided
-        if morse_code:
-            current_state = 'START'
-            path = ''
-            for symbol in morse_code:
-                path += symbol
-                next_state = f'{path}'
-
-                # Highlight the path by changing color to red
-                if (current_state, next_state, symbol) in edges:
-                    dot.edge(current_state, next_state, label=symbol, color='red', penwidth='2')
-                current_state = next_state
-
-            # Highlight the final state for the last character
-            final_state = f'{current_state}_decoded'
-            if final_state in dot.node_attr:
-                dot.node(final_state, style='filled', fillcolor='orange')
-
-        # Handle space (separation of words)
-        dot.edge('START', 'START', label='/ (space)')
-        dot.edge('START', 'START', label='space')
-
-        # Render and output the diagram as a PNG
-        dot.render('morse_decoder_fsa', format='png', cleanup=True)
+
+from morse_core import MorseDecoderFSA
+
+# How often the Tk thread checks for a finished diagram render
+FRAME_MS = 16
 
 # GUI Setup using Tkinter
 class MorseDecoderGUI:
     def __init__(self, root):
+        self.root = root
         self.decoder = MorseDecoderFSA()
 
+        # Diagrams render on worker threads; results are tagged with the request
+        # number so that cancelled or superseded renders are dropped
+        self.render_id = 0
+        self.render_results = queue.Queue()
+
         root.title("Morse Code Decoder")
         root.geometry("400x400")
 
@@ -134,6 +41,9 @@ class MorseDecoderGUI:
         self.diagram_button = tk.Button(root, text="Generate FSA Diagram", command=self.generate_diagram)
         self.diagram_button.pack(pady=10)
 
+        self.cancel_button = tk.Button(root, text="Cancel Diagram", command=self.cancel_diagram)
+        self.cancel_button.pack(pady=10)
+
         self.image_label = tk.Label(root)
         self.image_label.pack(pady=10)
 
@@ -144,17 +54,52 @@ class MorseDecoderGUI:
         self.output_text.insert(tk.END, decoded_message)
 
     def generate_diagram(self):
+        # Graphviz and the resize run off the Tk thread so the window stays responsive
         morse_code = self.input_text.get()
-        self.decoder.generate_finite_state_diagram(morse_code)
+        self.render_id += 1
+        self.diagram_button.config(state="disabled")
+        worker = threading.Thread(target=self.render_diagram, args=(self.render_id, morse_code), daemon=True)
+        worker.start()
+        self.root.after(FRAME_MS, self.poll_diagram, self.render_id)
+
+    def render_diagram(self, render_id, morse_code):
+        try:
+            # Served from the decoder's diagram cache after the first render
+            img = self.decoder.render_finite_state_diagram(morse_code, (1200, 600))
+            self.render_results.put((render_id, img, None))
+        except Exception as error:
+            self.render_results.put((render_id, None, error))
+
+    def poll_diagram(self, render_id):
+        from PIL import ImageTk
+
+        if render_id != self.render_id:
+            # This request was cancelled or superseded
+            return
+        # Results of cancelled or superseded renders are skipped
+        while True:
+            try:
+                result_id, img, error = self.render_results.get_nowait()
+            except queue.Empty:
+                self.root.after(FRAME_MS, self.poll_diagram, render_id)
+                return
+            if result_id == render_id:
+                break
+        self.diagram_button.config(state="normal")
+        if error is not None:
+            messagebox.showerror("Error", f"Could not render the FSA diagram: {error}")
+            return
 
         # Load and display the diagram image
-        img = Image.open("morse_decoder_fsa.png")
-        img = img.resize((1200, 600), Image.Resampling.LANCZOS)
         img = ImageTk.PhotoImage(img)
-
         self.image_label.config(image=img)
         self.image_label.image = img
 
+    def cancel_diagram(self):
+        # The Graphviz run cannot be interrupted, but its result is discarded
+        self.render_id += 1
+        self.diagram_button.config(state="normal")
+
 # Main application setup
 if __name__ == "__main__":
     root = tk.Tk()
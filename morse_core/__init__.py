@@ -0,0 +1,13 @@
+# Headless decoding core shared by the Tkinter apps; importing it never pulls
+# in tkinter, graphviz or PIL
+from .tables import CodeTable, get_table, morse_code_dict, register_table, table_names
+from .batch import decode_batch
+from .beam import BeamDecoder, LetterNgramScorer, WordListScorer, decode_tolerant
+from .cache import DecodeCache
+from .fsa import MorseDecoderFSA, iter_decode
+from .encoder import MorseEncoder
+from .fileio import decode_file
+from .metrics import DecoderMetrics
+from .pda import PDAMorseDecoder
+from .pda_canvas import PDAMorseDecoder as CanvasPDAMorseDecoder
+from .trie import CompiledMorseTable, compile_morse_table
@@ -0,0 +1,97 @@
+from .tables import get_table
+from .trie import DASH, DOT, LETTER_GAP, WORD_GAP
+
+# Byte classes of the joined batch. Every byte other than the four FSA symbols
+# is dropped before decoding, and the byte between two messages is marked as
+# a message end by position, so a '\n' inside a message is dropped like any
+# other stray byte.
+_IGNORED, _DOT, _DASH, _LETTER_END, _WORD_END, _MESSAGE_END = range(6)
+
+class BatchLookup:
+    # Letters keyed on (length, bit-pattern) of a dot/dash run, with dash = 1.
+    # The key is packed as a sentinel bit above the pattern, (1 << length) | pattern,
+    # so it doubles as an index into one flat array.
+    def __init__(self, morse_to_letter):
+        import numpy as np
+
+        self.max_length = max(len(code) for code in morse_to_letter)
+        letters = ['']
+        self.letter_index = np.zeros(1 << (self.max_length + 1), dtype=np.intp)
+        for code, letter in morse_to_letter.items():
+            pattern = 1
+            for symbol in code:
+                pattern = pattern << 1 | (symbol == '-')
+            self.letter_index[pattern] = len(letters)
+            letters.append(letter)
+
+        # Output token per run: the letter followed by nothing (' '), a space ('/')
+        # or a newline (end of message), indexed by letter * 3 + separator kind.
+        # The tokens are stored as UTF-8 in one byte array so that the output
+        # can be gathered without touching Python strings.
+        tokens = []
+        for letter in letters:
+            tokens.extend((letter, letter + ' ', letter + '\n'))
+        encoded = [token.encode('utf-8') for token in tokens]
+        self.token_lengths = np.array([len(token) for token in encoded], dtype=np.intp)
+        self.token_starts = np.concatenate(([0], np.cumsum(self.token_lengths)[:-1]))
+        self.token_bytes = np.frombuffer(b''.join(encoded), dtype=np.uint8)
+
+        self.byte_class = np.full(256, _IGNORED, dtype=np.uint8)
+        self.byte_class[DOT] = _DOT
+        self.byte_class[DASH] = _DASH
+        self.byte_class[LETTER_GAP] = _LETTER_END
+        self.byte_class[WORD_GAP] = _WORD_END
+
+_batch_lookups = {}
+
+def get_batch_lookup(morse_to_letter):
+    key = tuple(morse_to_letter.items())
+    lookup = _batch_lookups.get(key)
+    if lookup is None:
+        lookup = _batch_lookups[key] = BatchLookup(morse_to_letter)
+    return lookup
+
+def decode_batch(messages, table=None):
+    # Vectorized equivalent of [MorseDecoderFSA().decode(m) for m in messages]
+    import numpy as np
+
+    if not messages:
+        return []
+    lookup = get_batch_lookup(get_table(table).morse_to_letter)
+
+    # One encode for the whole batch. Non-ASCII characters become bytes the
+    # class table ignores; message ends are then found from byte lengths.
+    text = '\n'.join(messages) + '\n'
+    data = text.encode('utf-8', 'surrogatepass')
+    if len(data) == len(text):
+        lengths = np.fromiter(map(len, messages), dtype=np.intp, count=len(messages))
+    else:
+        byte_lengths = map(len, map(lambda message: message.encode('utf-8', 'surrogatepass'), messages))
+        lengths = np.fromiter(byte_lengths, dtype=np.intp, count=len(messages))
+    classes = lookup.byte_class[np.frombuffer(data, dtype=np.uint8)]
+    classes[np.cumsum(lengths + 1) - 1] = _MESSAGE_END
+    classes = classes[classes != _IGNORED]
+
+    # Each ' ', '/' or message end closes the run of dots and dashes in front of it
+    boundaries = np.flatnonzero(classes >= _LETTER_END)
+    run_lengths = np.diff(boundaries, prepend=-1) - 1
+
+    # Key of each run, built from its end backwards: the k-th symbol from the
+    # end sets bit k - 1 when it is a dash, and runs longer than any code, and
+    # empty runs, map to the empty letter at key 0
+    is_dash = (classes == _DASH).view(np.uint8)
+    valid = (run_lengths > 0) & (run_lengths <= lookup.max_length)
+    keys = np.where(valid, np.left_shift(1, np.where(valid, run_lengths, 0)), 0)
+    runs = np.flatnonzero(valid)
+    for k in range(1, lookup.max_length + 1):
+        runs = runs[run_lengths[runs] >= k]
+        keys[runs] |= is_dash[boundaries[runs] - k].astype(keys.dtype) << (k - 1)
+    letter_ids = lookup.letter_index[keys]
+
+    # Gather the token bytes of every run into one output buffer
+    tokens = letter_ids * 3 + (classes[boundaries] - _LETTER_END)
+    token_lengths = lookup.token_lengths[tokens]
+    output_starts = np.cumsum(token_lengths) - token_lengths
+    offsets = np.repeat(lookup.token_starts[tokens] - output_starts, token_lengths)
+    output = lookup.token_bytes[offsets + np.arange(len(offsets))]
+    return output.tobytes().decode('utf-8').split('\n')[:-1]
@@ -0,0 +1,308 @@
+import heapq
+import math
+
+from .tables import get_table
+from .trie import DASH, DOT, LETTER_GAP, WORD_GAP
+
+# Error-tolerant decoding. Where the FSA drops a sequence it cannot decode,
+# this keeps several readings of the input alive at once and lets each one
+# repair it with edits that cost a penalty:
+#
+#   flip          a dot sent as a dash or the other way round
+#   missing gap   two letters run together ('.--...' for '.-- ...')
+#   spurious gap  one letter split in two ('.- -.' read as '.--.')
+#
+# Every symbol moves each reading one step through the compiled code trie.
+# Readings that reach the same trie state with the same output are merged
+# (only the cheapest survives), and only the `beam_width` cheapest readings
+# within `max_cost` of the best are kept, so the cost of a decode is linear in
+# the input length and it can keep up with a live feed. An optional scorer
+# adds a language-model cost to each letter and word: any object with
+# `context` (characters of history it wants), letter_cost(history, word,
+# letter) and word_cost(word), such as the two scorers below.
+
+FLIP_COST = 2.0
+GAP_COST = 2.5
+SPURIOUS_GAP_COST = 2.5
+UNKNOWN_COST = 4.0
+
+# Fixed lag: every LAG_INTERVAL input bytes, a reading whose output left the
+# best reading's more than MAX_LAG output nodes back is dropped, so the text
+# all readings agree on keeps moving forward and feed() can return it. The
+# check runs at fixed input positions, so results do not depend on how the
+# input is split into chunks.
+MAX_LAG = 64
+LAG_INTERVAL = 256
+# Unreachable output nodes are swept once the tree is this many times the
+# size it was after the previous sweep
+MIN_SWEEP_NODES = 4096
+
+class LetterNgramScorer:
+    # Letter n-gram model with add-one smoothing, trained on plain text.
+    # The cost of a letter is -log P(letter | previous order-1 characters).
+    def __init__(self, text, order=3):
+        self.order = order
+        self.context = order - 1
+        self.counts = {}
+        self.history_counts = {}
+        text = ' '.join(text.upper().split())
+        alphabet = set(text)
+        self.vocabulary_size = len(alphabet) + 1
+        padded = ' ' * self.context + text
+        for end in range(self.context, len(padded)):
+            history = padded[end - self.context:end]
+            gram = history + padded[end]
+            self.counts[gram] = self.counts.get(gram, 0) + 1
+            self.history_counts[history] = self.history_counts.get(history, 0) + 1
+
+    def letter_cost(self, history, word, letter):
+        history = history.rjust(self.context)
+        count = self.counts.get(history + letter, 0)
+        total = self.history_counts.get(history, 0)
+        return -math.log((count + 1) / (total + self.vocabulary_size))
+
+    def word_cost(self, word):
+        return 0.0
+
+class WordListScorer:
+    # Dictionary scoring: a word that is not in `words` costs unknown_word_cost,
+    # and a partial word that no dictionary word starts with is charged as soon
+    # as it stops being a prefix, which prunes it early on a live feed
+    def __init__(self, words, unknown_word_cost=3.0):
+        self.context = 0
+        self.unknown_word_cost = unknown_word_cost
+        self.words = {word.upper() for word in words}
+        self.prefixes = {word[:end] for word in self.words for end in range(len(word) + 1)}
+
+    def letter_cost(self, history, word, letter):
+        if word in self.prefixes and word + letter not in self.prefixes:
+            return self.unknown_word_cost
+        return 0.0
+
+    def word_cost(self, word):
+        # Already charged if the word stopped being a prefix on the way
+        if not word or word in self.words or word not in self.prefixes:
+            return 0.0
+        return self.unknown_word_cost
+
+class BeamDecoder:
+    # Streaming, error-tolerant decoder with the feed()/flush() interface of
+    # MorseDecoderFSA. Each reading is stored as
+    #     (trie state, output id) -> (cost, current word, history)
+    # where the output id points into a shared tree of emitted text, so
+    # extending a reading never copies the text decoded so far. The tree is
+    # rooted at the end of the text already returned by feed(); everything
+    # above the root, and every node no reading can reach, is dropped.
+    def __init__(self, table=None, beam_width=16, max_cost=12.0, scorer=None,
+                 flip_cost=FLIP_COST, gap_cost=GAP_COST, spurious_gap_cost=SPURIOUS_GAP_COST,
+                 unknown_cost=UNKNOWN_COST, max_lag=MAX_LAG):
+        compiled = get_table(table).compiled
+        self.table = compiled.table
+        self.letters = compiled.letters
+        self.beam_width = beam_width
+        self.max_cost = max_cost
+        self.scorer = scorer
+        self.flip_cost = flip_cost
+        self.gap_cost = gap_cost
+        self.spurious_gap_cost = spurious_gap_cost
+        self.unknown_cost = unknown_cost
+        self.max_lag = max_lag
+        self.reset()
+
+    def reset(self):
+        # Output tree: node id -> (parent, text, depth); self.root is the
+        # empty output
+        self.nodes = {0: (None, '', 0)}
+        self.node_ids = {}
+        self.next_node = 1
+        self.root = 0
+        self.sweep_at = MIN_SWEEP_NODES
+        self.until_lag_check = LAG_INTERVAL
+        self.beam = {(0, 0): (0.0, '', '')}
+
+    def extend(self, output, text):
+        key = (output, text)
+        node = self.node_ids.get(key)
+        if node is None:
+            node = self.node_ids[key] = self.next_node
+            self.next_node += 1
+            self.nodes[node] = (output, text, self.nodes[output][2] + 1)
+        return node
+
+    def text(self, output):
+        # Text from the root down to `output`
+        nodes = self.nodes
+        parts = []
+        while output != self.root:
+            output, text, _ = nodes[output]
+            parts.append(text)
+        return ''.join(reversed(parts))
+
+    def ancestor(self, output, depth):
+        nodes = self.nodes
+        while nodes[output][2] > depth:
+            output = nodes[output][0]
+        return output
+
+    def common_ancestor(self, first, second):
+        nodes = self.nodes
+        while first != second:
+            if nodes[first][2] >= nodes[second][2]:
+                first = nodes[first][0]
+            else:
+                second = nodes[second][0]
+        return first
+
+    def drop_lagging(self):
+        # Drop readings that left the best one more than max_lag nodes back
+        nodes = self.nodes
+        best = min(self.beam.items(), key=lambda item: item[1][0])[0][1]
+        floor = nodes[best][2] - self.max_lag
+        if floor > nodes[self.root][2]:
+            anchor = self.ancestor(best, floor)
+            self.beam = {key: value for key, value in self.beam.items()
+                         if self.ancestor(key[1], floor) == anchor}
+
+    def commit(self):
+        # Move the root down to the output every reading shares and return the
+        # text between the old root and the new one
+        nodes = self.nodes
+        outputs = iter(self.beam)
+        shared = next(outputs)[1]
+        for _, output in outputs:
+            shared = self.common_ancestor(shared, output)
+        if shared == self.root:
+            return ''
+        committed = self.text(shared)
+        self.root = shared
+        if len(nodes) >= self.sweep_at:
+            self.sweep()
+        return committed
+
+    def sweep(self):
+        # Keep only the root and the nodes on the way down to a live reading
+        nodes = self.nodes
+        kept = {self.root: (None, '', nodes[self.root][2])}
+        for _, output in self.beam:
+            while output not in kept:
+                kept[output] = nodes[output]
+                output = nodes[output][0]
+        self.nodes = kept
+        self.node_ids = {(parent, text): node for node, (parent, text, _) in kept.items() if parent is not None}
+        self.sweep_at = max(MIN_SWEEP_NODES, 4 * len(kept))
+
+    def emit(self, state, output, cost, word, history, word_end):
+        # Close the letter pending in `state`; unknown codes emit nothing, as
+        # in the FSA, but cost unknown_cost
+        letter = self.letters[state]
+        if state and not letter:
+            cost += self.unknown_cost
+        scorer = self.scorer
+        if scorer is not None:
+            if letter:
+                cost += scorer.letter_cost(history, word, letter)
+                word += letter
+                history = (history + letter)[-scorer.context:] if scorer.context else ''
+            if word_end:
+                cost += scorer.word_cost(word)
+                word = ''
+                history = (history + ' ')[-scorer.context:] if scorer.context else ''
+        # Letters and word spaces are separate nodes, so equal text always
+        # means an equal output id and equal readings merge
+        if letter:
+            output = self.extend(output, letter)
+        if word_end:
+            output = self.extend(output, ' ')
+        return output, cost, word, history
+
+    def step(self, byte):
+        table = self.table
+        candidates = {}
+
+        def add(state, output, cost, word, history):
+            key = (state, output)
+            best = candidates.get(key)
+            if best is None or cost < best[0]:
+                candidates[key] = (cost, word, history)
+
+        if byte == DOT or byte == DASH:
+            other = DASH if byte == DOT else DOT
+            for (state, output), (cost, word, history) in self.beam.items():
+                add(table[state << 8 | byte], output, cost, word, history)
+                add(table[state << 8 | other], output, cost + self.flip_cost, word, history)
+                if state:
+                    # A letter gap was lost in front of this symbol
+                    emitted, gap_cost, gap_word, gap_history = self.emit(
+                        state, output, cost + self.gap_cost, word, history, False)
+                    add(table[byte], emitted, gap_cost, gap_word, gap_history)
+        elif byte == LETTER_GAP:
+            for (state, output), (cost, word, history) in self.beam.items():
+                add(0, *self.emit(state, output, cost, word, history, False))
+                if state:
+                    # The gap splits a letter: read straight through it
+                    add(state, output, cost + self.spurious_gap_cost, word, history)
+        elif byte == WORD_GAP:
+            for (state, output), (cost, word, history) in self.beam.items():
+                add(0, *self.emit(state, output, cost, word, history, True))
+        else:
+            return
+        self.prune(candidates)
+
+    def prune(self, candidates):
+        if not candidates:
+            return
+        limit = min(cost for cost, _, _ in candidates.values()) + self.max_cost
+        kept = [item for item in candidates.items() if item[1][0] <= limit]
+        if len(kept) > self.beam_width:
+            kept = heapq.nsmallest(self.beam_width, kept, key=lambda item: item[1][0])
+        self.beam = dict(kept)
+
+    def feed(self, chunk):
+        # Returns the text every surviving reading agrees on, like
+        # MorseDecoderFSA.feed; the rest waits in the beam for later input
+        if isinstance(chunk, str):
+            chunk = chunk.encode('ascii', 'ignore')
+        committed = []
+        start = 0
+        while start < len(chunk):
+            end = min(len(chunk), start + self.until_lag_check)
+            for byte in chunk[start:end]:
+                self.step(byte)
+            self.until_lag_check -= end - start
+            start = end
+            if not self.until_lag_check:
+                self.drop_lagging()
+                self.until_lag_check = LAG_INTERVAL
+                committed.append(self.commit())
+        committed.append(self.commit())
+        return ''.join(committed)
+
+    def hypotheses(self, top_k=1, final=True):
+        # The top_k distinct decodings of the input not yet returned by feed(),
+        # as (text, cost), cheapest first. With final=True the pending letter
+        # of each reading is closed as at the end of the input; the beam
+        # itself is left untouched either way.
+        finished = {}
+        for (state, output), (cost, word, history) in self.beam.items():
+            if final:
+                output, cost, word, history = self.emit(state, output, cost, word, history, False)
+                if self.scorer is not None:
+                    cost += self.scorer.word_cost(word)
+            if output not in finished or cost < finished[output]:
+                finished[output] = cost
+        best = heapq.nsmallest(top_k, finished.items(), key=lambda item: item[1])
+        return [(self.text(output), cost) for output, cost in best]
+
+    def best(self):
+        return self.hypotheses(1)[0][0]
+
+    def flush(self, top_k=1):
+        results = self.hypotheses(top_k)
+        self.reset()
+        return results
+
+def decode_tolerant(morse_code, top_k=5, table=None, **options):
+    # One-shot error-tolerant decode; see BeamDecoder for the options
+    decoder = BeamDecoder(table, **options)
+    committed = decoder.feed(morse_code)
+    return [(committed + text, cost) for text, cost in decoder.flush(top_k)]
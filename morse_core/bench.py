@@ -0,0 +1,219 @@
+import argparse
+import gc
+import json
+import os
+import platform
+import random
+import sys
+import tempfile
+import time
+import tracemalloc
+
+from .batch import decode_batch
+from .encoder import MorseEncoder
+from .fsa import MorseDecoderFSA
+from .pda import PDAMorseDecoder
+from .pda_canvas import PDAMorseDecoder as CanvasPDAMorseDecoder
+from .tables import morse_code_dict
+from .trace import TRACE_OFF
+
+# Reproducible benchmarks for the decoders. Corpora are generated from a fixed
+# seed and cached on disk, one message per line, with a mix of word lengths
+# and some invalid codes and stray characters. Results are printed as JSON
+# so that runs can be diffed to catch regressions:
+#
+#     python -m morse_core.bench --sizes 1K,1M,100M --output bench.json
+
+SIZES = {'1K': 1 << 10, '1M': 1 << 20, '100M': 100 << 20}
+CORPUS_DIR = 'bench_corpora'
+LATENCY_SAMPLES = 10000
+
+INVALID_CODES = ('......', '.-.-.-.-', '--------')
+STRAY_SYMBOLS = 'x#_'
+
+def generate_corpus(size, seed=0, invalid_rate=0.02, vocabulary_size=5000):
+    # Messages are drawn from a fixed vocabulary of random words, which keeps
+    # generating the 100 MB corpus quick
+    rng = random.Random(seed)
+    encoder = MorseEncoder()
+    letters = ''.join(morse_code_dict.values())
+    vocabulary = []
+    for _ in range(vocabulary_size):
+        word = encoder.encode(''.join(rng.choice(letters) for _ in range(rng.randint(1, 8))))
+        if rng.random() < invalid_rate:
+            word = rng.choice(INVALID_CODES) + ' ' + word
+        if rng.random() < invalid_rate:
+            position = rng.randrange(len(word))
+            word = word[:position] + rng.choice(STRAY_SYMBOLS) + word[position:]
+        vocabulary.append(word)
+    lines = []
+    total = 0
+    while total < size:
+        line = '/'.join(rng.choices(vocabulary, k=rng.randint(1, 12)))
+        lines.append(line)
+        total += len(line) + 1
+    return ('\n'.join(lines) + '\n')[:size]
+
+def load_corpus(size, seed=0, corpus_dir=CORPUS_DIR):
+    path = os.path.join(corpus_dir, f'corpus_{size}_{seed}.txt')
+    if os.path.exists(path):
+        with open(path, encoding='ascii') as file:
+            return file.read()
+    corpus = generate_corpus(size, seed)
+    os.makedirs(corpus_dir, exist_ok=True)
+    with open(path, 'w', encoding='ascii') as file:
+        file.write(corpus)
+    return corpus
+
+def percentiles(samples, points=(50, 90, 99)):
+    samples = sorted(samples)
+    result = {f'p{point}': samples[min(len(samples) - 1, len(samples) * point // 100)] for point in points}
+    result['max'] = samples[-1]
+    return result
+
+def measure(decode, corpus, repeat):
+    # Best-of-N throughput over the whole corpus, then peak traced memory of one run
+    best = float('inf')
+    for _ in range(repeat):
+        gc.collect()
+        start = time.perf_counter()
+        decode(corpus)
+        best = min(best, time.perf_counter() - start)
+    gc.collect()
+    tracemalloc.start()
+    decode(corpus)
+    peak = tracemalloc.get_traced_memory()[1]
+    tracemalloc.stop()
+    return {'seconds': best, 'symbols_per_second': len(corpus) / best if best else None, 'peak_bytes': peak}
+
+def measure_latency(decode, corpus):
+    # Per-call latency on individual messages, in microseconds
+    messages = corpus.splitlines()[:LATENCY_SAMPLES]
+    timings = []
+    for message in messages:
+        start = time.perf_counter()
+        decode(message)
+        timings.append((time.perf_counter() - start) * 1e6)
+    return percentiles(timings) if timings else None
+
+def fsa_decode(corpus):
+    return MorseDecoderFSA().decode(corpus)
+
+def batch_decode(corpus):
+    # The corpus lines as one vectorized batch (needs NumPy)
+    return decode_batch(corpus.splitlines())
+
+def pda_decode(corpus):
+    # Headless: no-op callbacks and no tracing, as a batch job would run it
+    decoder = PDAMorseDecoder(lambda message: None, lambda stack: None, TRACE_OFF)
+    decoder.set_input(corpus)
+    decoder.decode_all()
+    return decoder.decoded_message
+
+def canvas_pda_decode(corpus):
+    ignore = lambda value: None
+    decoder = CanvasPDAMorseDecoder(ignore, ignore, ignore, ignore, TRACE_OFF)
+    decoder.set_input(corpus)
+    decoder.decode_all()
+    return decoder.decoded_message
+
+# Decoders that step symbol by symbol and are held to --pda-limit
+STEPPING = ('pda', 'canvas_pda')
+
+DECODERS = {
+    'fsa': fsa_decode,
+    'batch': batch_decode,
+    'pda': pda_decode,
+    'canvas_pda': canvas_pda_decode,
+}
+
+def bench_diagram():
+    # Cold generate_finite_state_diagram (Graphviz layout and PNG write), then
+    # per input the same public call against the cached layout, and the
+    # resized render the GUI shows. The PNG goes to a scratch directory.
+    from .diagram import get_layout, render_cache
+
+    get_layout.cache_clear()
+    render_cache.clear()
+    decoder = MorseDecoderFSA()
+    result = {}
+    try:
+        with tempfile.TemporaryDirectory() as scratch:
+            path = os.path.join(scratch, 'morse_decoder_fsa.png')
+            start = time.perf_counter()
+            decoder.generate_finite_state_diagram('.-', path)
+            result['cold_seconds'] = time.perf_counter() - start
+            timings = []
+            for code in morse_code_dict:
+                start = time.perf_counter()
+                decoder.generate_finite_state_diagram(code, path)
+                timings.append((time.perf_counter() - start) * 1e6)
+            result['generate_latency_us'] = percentiles(timings)
+        timings = []
+        for code in morse_code_dict:
+            start = time.perf_counter()
+            decoder.render_finite_state_diagram(code, (1200, 600))
+            timings.append((time.perf_counter() - start) * 1e6)
+        result['overlay_latency_us'] = percentiles(timings)
+    except Exception as error:
+        # graphviz, its `dot` binary or PIL may be missing on a headless box
+        result['error'] = f'{type(error).__name__}: {error}'
+    return result
+
+def run(sizes, decoders, repeat=3, seed=0, pda_limit=SIZES['1M'], diagram=True):
+    results = {
+        'python': sys.version.split()[0],
+        'platform': platform.platform(),
+        'timestamp': time.strftime('%Y-%m-%dT%H:%M:%S'),
+        'seed': seed,
+        'results': [],
+    }
+    for label in sizes:
+        corpus = load_corpus(SIZES[label], seed)
+        for name in decoders:
+            entry = {'decoder': name, 'size': label, 'bytes': len(corpus)}
+            if name in STEPPING and len(corpus) > pda_limit:
+                # The PDAs step symbol by symbol; keep the default run short
+                entry['skipped'] = f'larger than --pda-limit ({pda_limit} bytes)'
+            else:
+                decode = DECODERS[name]
+                try:
+                    entry.update(measure(decode, corpus, repeat))
+                    entry['latency_us'] = measure_latency(decode, corpus)
+                except ImportError as error:
+                    # NumPy may be missing for the batch decoder
+                    entry['error'] = f'{type(error).__name__}: {error}'
+            results['results'].append(entry)
+    if diagram:
+        results['diagram'] = bench_diagram()
+    return results
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Benchmark the Morse decoders and report JSON.")
+    parser.add_argument('--sizes', default='1K,1M,100M', help="comma-separated corpus sizes from " + ', '.join(SIZES))
+    parser.add_argument('--decoders', default=','.join(DECODERS), help="comma-separated decoders to time")
+    parser.add_argument('--repeat', type=int, default=3, help="timed runs per case; the best is reported")
+    parser.add_argument('--seed', type=int, default=0, help="corpus generator seed")
+    parser.add_argument('--pda-limit', type=int, default=SIZES['1M'], help="largest corpus given to the PDAs, in bytes")
+    parser.add_argument('--no-diagram', action='store_true', help="skip the Graphviz diagram benchmark")
+    parser.add_argument('-o', '--output', help="write the JSON report here instead of stdout")
+    args = parser.parse_args(argv)
+
+    sizes = [size for size in args.sizes.split(',') if size]
+    decoders = [name for name in args.decoders.split(',') if name]
+    for size in sizes:
+        if size not in SIZES:
+            parser.error(f"unknown size {size!r}")
+    for name in decoders:
+        if name not in DECODERS:
+            parser.error(f"unknown decoder {name!r}")
+
+    report = json.dumps(run(sizes, decoders, args.repeat, args.seed, args.pda_limit, not args.no_diagram), indent=2)
+    if args.output:
+        with open(args.output, 'w', encoding='utf-8') as file:
+            file.write(report + '\n')
+    else:
+        print(report)
+
+if __name__ == "__main__":
+    main()
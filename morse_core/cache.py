@@ -0,0 +1,121 @@
+from collections import OrderedDict
+
+# Optional memo for repetitive traffic (callsigns, Q-codes, fixed phrases) in
+# front of MorseDecoderFSA.decode and decode_batch. A '/' always sends the FSA
+# back to its start state, so a message decodes as its '/'-separated words
+# decoded on their own and joined with spaces; that makes single words as
+# well as whole messages safe to memoize. Both levels are bounded LRUs.
+
+DEFAULT_MAX_WORDS = 4096
+DEFAULT_MAX_MESSAGES = 1024
+# Longer words and messages are decoded directly and never stored, so one
+# huge transcript cannot flush the cache or pin a large string in it
+MAX_WORD_LENGTH = 64
+MAX_MESSAGE_LENGTH = 4096
+
+class DecodeCache:
+    def __init__(self, max_words=DEFAULT_MAX_WORDS, max_messages=DEFAULT_MAX_MESSAGES,
+                 max_word_length=MAX_WORD_LENGTH, max_message_length=MAX_MESSAGE_LENGTH):
+        self.max_words = max_words
+        self.max_messages = max_messages
+        self.max_word_length = max_word_length
+        self.max_message_length = max_message_length
+        self.code_table = None
+        self.words = OrderedDict()
+        self.messages = OrderedDict()
+        self.reset_stats()
+
+    def reset_stats(self):
+        self.word_hits = 0
+        self.word_misses = 0
+        self.message_hits = 0
+        self.message_misses = 0
+        self.evictions = 0
+
+    def clear(self):
+        self.words.clear()
+        self.messages.clear()
+
+    def bind(self, code_table):
+        # Entries are only valid for one code table; a decoder using another
+        # table empties the cache rather than reading wrong letters from it
+        if code_table is not self.code_table:
+            self.clear()
+            self.code_table = code_table
+
+    def decode(self, morse_code, compiled, metrics=None):
+        if len(morse_code) > self.max_message_length:
+            return compiled.decode(morse_code, metrics)
+        messages = self.messages
+        decoded = messages.get(morse_code)
+        if decoded is not None:
+            messages.move_to_end(morse_code)
+            self.message_hits += 1
+            return decoded
+        self.message_misses += 1
+        word_gap = '/' if isinstance(morse_code, str) else b'/'
+        decoded = ' '.join([self.decode_word(word, compiled, metrics) for word in morse_code.split(word_gap)])
+        self.store(messages, morse_code, decoded, self.max_messages)
+        return decoded
+
+    def decode_word(self, word, compiled, metrics=None):
+        if len(word) > self.max_word_length:
+            return compiled.decode(word, metrics)
+        words = self.words
+        decoded = words.get(word)
+        if decoded is not None:
+            words.move_to_end(word)
+            self.word_hits += 1
+            return decoded
+        self.word_misses += 1
+        decoded = compiled.decode(word, metrics)
+        self.store(words, word, decoded, self.max_words)
+        return decoded
+
+    def store(self, entries, key, value, limit):
+        entries[key] = value
+        if len(entries) > limit:
+            entries.popitem(last=False)
+            self.evictions += 1
+
+    def decode_batch(self, messages, decode_misses):
+        # Serve repeated messages from the cache and hand each distinct miss
+        # to decode_misses (a list-in, list-out batch decoder) once
+        results = [None] * len(messages)
+        pending = {}
+        cached = self.messages
+        for position, message in enumerate(messages):
+            decoded = cached.get(message)
+            if decoded is not None:
+                cached.move_to_end(message)
+                self.message_hits += 1
+                results[position] = decoded
+            elif message in pending:
+                # Repeated within this batch: decoded once with the first
+                self.message_hits += 1
+                pending[message].append(position)
+            else:
+                self.message_misses += 1
+                pending[message] = [position]
+        if pending:
+            misses = list(pending)
+            for message, decoded in zip(misses, decode_misses(misses)):
+                for position in pending[message]:
+                    results[position] = decoded
+                if len(message) <= self.max_message_length:
+                    self.store(cached, message, decoded, self.max_messages)
+        return results
+
+    def stats(self):
+        lookups = self.word_hits + self.word_misses + self.message_hits + self.message_misses
+        hits = self.word_hits + self.message_hits
+        return {
+            'word_hits': self.word_hits,
+            'word_misses': self.word_misses,
+            'message_hits': self.message_hits,
+            'message_misses': self.message_misses,
+            'evictions': self.evictions,
+            'words': len(self.words),
+            'messages': len(self.messages),
+            'hit_rate': hits / lookups if lookups else None,
+        }
@@ -0,0 +1,245 @@
+import argparse
+import csv
+import glob
+import io
+import json
+import os
+import sys
+import time
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor
+
+from .cache import DecodeCache
+from .fsa import MorseDecoderFSA, iter_decode
+from .metrics import DecoderMetrics
+from .parallel import decode_parallel
+from .pda import PDAMorseDecoder
+from .tables import DEFAULT_TABLE, get_table, table_names
+from .trace import TRACE_OFF
+
+# Batch decoding for shell pipelines, no display needed:
+#
+#     python -m morse_core transcripts/*.txt --format jsonl --jobs 8 > out.jsonl
+#     cat calls.txt | python -m morse_core --engine pda
+#
+# In line mode every input line is one message; in file mode every input is.
+# Messages travel to worker processes in chunks of CHUNK_MESSAGES and come
+# back as formatted text. At most a few chunks per worker are in flight, so
+# stdin of any length streams through with bounded memory while the output
+# keeps the input order.
+
+ENGINES = ('fsa', 'pda')
+MODES = ('line', 'file')
+FORMATS = ('text', 'jsonl', 'csv')
+CSV_FIELDS = ('source', 'line', 'decoded', 'symbols', 'letters', 'unknown_codes', 'seconds')
+
+IO_BUFFER_SIZE = 1 << 20
+CHUNK_MESSAGES = 4096
+CHUNKS_PER_JOB = 4
+
+# Per-process decoder, built once by _init_worker like in parallel.py
+_worker = None
+
+class MessageDecoder:
+    # One engine behind a single decode(message) -> (text, stats) call.
+    # Messages are bytes; stats is None unless with_stats is set.
+    def __init__(self, engine='fsa', table=None, with_stats=False, cache=False):
+        self.metrics = DecoderMetrics() if with_stats else None
+        self.engine = engine
+        if engine == 'fsa':
+            self.decoder = MorseDecoderFSA(self.metrics, table, DecodeCache() if cache else None)
+        else:
+            ignore = lambda *args: None
+            self.decoder = PDAMorseDecoder(ignore, ignore, TRACE_OFF, metrics=self.metrics, table=table)
+
+    def decode(self, message):
+        metrics = self.metrics
+        if metrics is not None:
+            metrics.reset()
+            start = time.perf_counter()
+        if self.engine == 'fsa':
+            decoded = self.decoder.decode(message)
+        else:
+            self.decoder.set_input(message.decode('utf-8', 'replace'))
+            self.decoder.run_to_end(None)
+            decoded = self.decoder.decoded_message
+        if metrics is None:
+            return decoded, None
+        return decoded, {
+            'symbols': metrics.symbols,
+            'letters': metrics.letters,
+            'unknown_codes': metrics.unknown_codes,
+            'seconds': time.perf_counter() - start,
+        }
+
+class RecordFormatter:
+    # Renders decoded messages as output text. It runs in the workers, so the
+    # parent process only writes finished blocks.
+    def __init__(self, output_format):
+        self.output_format = output_format
+        self.buffer = io.StringIO()
+        self.csv = csv.writer(self.buffer) if output_format == 'csv' else None
+
+    def header(self):
+        if self.csv is None:
+            return ''
+        self.csv.writerow(CSV_FIELDS)
+        return self.take()
+
+    def take(self):
+        text = self.buffer.getvalue()
+        self.buffer.seek(0)
+        self.buffer.truncate()
+        return text
+
+    def format(self, source, line, decoded, stats):
+        if self.output_format == 'text':
+            self.buffer.write(decoded + '\n')
+            return
+        record = {'source': source, 'line': line, 'decoded': decoded, **stats}
+        if self.csv is not None:
+            self.csv.writerow([record[field] for field in CSV_FIELDS])
+        else:
+            self.buffer.write(json.dumps(record, ensure_ascii=False) + '\n')
+
+def _init_worker(engine, morse_to_letter, output_format, cache):
+    global _worker
+    _worker = (MessageDecoder(engine, morse_to_letter, output_format != 'text', cache), RecordFormatter(output_format))
+
+def _decode_chunk(chunk):
+    # Output text for a list of (source, line, message)
+    decoder, formatter = _worker
+    for source, line, message in chunk:
+        formatter.format(source, line, *decoder.decode(message))
+    return formatter.take()
+
+def expand_inputs(patterns):
+    # '-' is stdin; a directory stands for the files directly inside it, as in
+    # parallel.main; anything else is a file or a glob, expanded in sorted order
+    paths = []
+    for pattern in patterns or ['-']:
+        if pattern == '-' or os.path.isfile(pattern):
+            paths.append(pattern)
+            continue
+        if os.path.isdir(pattern):
+            matches = sorted(
+                os.path.join(pattern, name) for name in os.listdir(pattern)
+                if os.path.isfile(os.path.join(pattern, name))
+            )
+        else:
+            matches = sorted(path for path in glob.glob(pattern, recursive=True) if os.path.isfile(path))
+        if not matches:
+            raise FileNotFoundError(f"no input files match {pattern!r}")
+        paths.extend(matches)
+    return paths
+
+def open_input(path):
+    if path == '-':
+        return open(sys.stdin.fileno(), 'rb', buffering=IO_BUFFER_SIZE, closefd=False)
+    return open(path, 'rb', buffering=IO_BUFFER_SIZE)
+
+def iter_messages(paths, mode):
+    # (source, line number, message bytes); the line number is None in file mode
+    for path in paths:
+        with open_input(path) as file:
+            if mode == 'file':
+                yield path, None, file.read()
+            else:
+                for number, line in enumerate(file, 1):
+                    yield path, number, line.rstrip(b'\r\n')
+
+def iter_chunks(items, size=CHUNK_MESSAGES):
+    chunk = []
+    for item in items:
+        chunk.append(item)
+        if len(chunk) == size:
+            yield chunk
+            chunk = []
+    if chunk:
+        yield chunk
+
+def iter_decoded(chunks, jobs, engine, table, output_format, cache):
+    # Output text chunk by chunk, in input order
+    args = (engine, dict(get_table(table).morse_to_letter), output_format, cache)
+    if jobs == 1:
+        _init_worker(*args)
+        for chunk in chunks:
+            yield _decode_chunk(chunk)
+        return
+    with ProcessPoolExecutor(max_workers=jobs, initializer=_init_worker, initargs=args) as executor:
+        pending = deque()
+        window = (jobs or os.cpu_count() or 1) * CHUNKS_PER_JOB
+        chunks = iter(chunks)
+        while True:
+            while len(pending) < window:
+                chunk = next(chunks, None)
+                if chunk is None:
+                    break
+                pending.append(executor.submit(_decode_chunk, chunk))
+            if not pending:
+                break
+            yield pending.popleft().result()
+
+def stream_file(path, output, table):
+    # Plain FSA decoding of one whole input, fed through in large blocks so its
+    # size never matters
+    with open_input(path) as file:
+        for decoded in iter_decode(file, MorseDecoderFSA(table=table), IO_BUFFER_SIZE):
+            output.write(decoded)
+    output.write('\n')
+
+def run(paths, output, engine='fsa', mode='line', output_format='text', jobs=1, table=None, cache=False):
+    if mode == 'file' and engine == 'fsa' and output_format == 'text':
+        if jobs == 1 or len(paths) == 1 and paths[0] == '-':
+            for path in paths:
+                stream_file(path, output, table)
+            return
+        if len(paths) == 1:
+            # One big transcript: split it into shards instead of files
+            with open_input(paths[0]) as file:
+                output.write(decode_parallel(file.read(), jobs, table=table) + '\n')
+            return
+    output.write(RecordFormatter(output_format).header())
+    # Files are only read as their turn comes, so chunk them one at a time
+    chunk_size = 1 if mode == 'file' else CHUNK_MESSAGES
+    chunks = iter_chunks(iter_messages(paths, mode), chunk_size)
+    for text in iter_decoded(chunks, jobs, engine, table, output_format, cache):
+        output.write(text)
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(prog="python -m morse_core", description="Decode Morse from stdin, files or globs without a display.")
+    parser.add_argument('inputs', nargs='*', help="files, directories or glob patterns; '-' or nothing reads stdin")
+    parser.add_argument('-o', '--output', help="write here instead of stdout")
+    parser.add_argument('--engine', default='fsa', choices=ENGINES, help="decoder to run (default: fsa)")
+    parser.add_argument('--mode', default='line', choices=MODES, help="one message per line, or per input (default: line)")
+    parser.add_argument('--format', dest='output_format', default='text', choices=FORMATS,
+                        help="text, or JSONL/CSV records with per-message stats (default: text)")
+    parser.add_argument('-j', '--jobs', type=int, default=1, help="worker processes; 0 uses every CPU (default: 1)")
+    parser.add_argument('--table', default=DEFAULT_TABLE, choices=table_names(), help="code table to decode with")
+    parser.add_argument('--cache', action='store_true', help="memoize repeated words and messages (fsa, text format)")
+    args = parser.parse_args(argv)
+
+    if args.jobs < 0:
+        parser.error("--jobs must be 0 or more")
+    if args.cache and (args.engine != 'fsa' or args.output_format != 'text'):
+        # Cache hits skip the decoder, so they would report no letters
+        parser.error("--cache only applies to the fsa engine with text output")
+    try:
+        paths = expand_inputs(args.inputs)
+    except FileNotFoundError as error:
+        parser.error(str(error))
+
+    jobs = args.jobs or None
+    if args.output:
+        output = open(args.output, 'w', encoding='utf-8', newline='', buffering=IO_BUFFER_SIZE)
+    else:
+        output = open(sys.stdout.fileno(), 'w', encoding='utf-8', newline='', buffering=IO_BUFFER_SIZE, closefd=False)
+    try:
+        with output:
+            run(paths, output, args.engine, args.mode, args.output_format, jobs, args.table, args.cache)
+    except BrokenPipeError:
+        # Reader went away (e.g. `| head`); stop quietly like other filters
+        pass
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,188 @@
+import io
+import shlex
+import threading
+from collections import OrderedDict
+from functools import lru_cache
+
+# FSA diagrams are laid out by Graphviz once per code table. The highlighted
+# path for an input is then drawn with PIL straight onto a copy of the cached
+# image, at the edge and node positions Graphviz reported, so refreshing the
+# diagram never re-runs `dot`. graphviz and PIL are imported on first use.
+
+PAD_INCHES = 0.1
+HIGHLIGHT_COLOR = (255, 0, 0)
+FINAL_STATE_COLOR = (255, 165, 0)
+# Budget for cached resized renders. Full-size images (about 7.7 MB for the
+# ITU table) are never cached, only the highlight drawn on them.
+RENDER_CACHE_BYTES = 32 << 20
+
+def build_fsa_graph(morse_to_letter):
+    import graphviz
+
+    dot = graphviz.Digraph(comment='Morse Decoder FSA')
+    dot.attr(rankdir='LR', pad=str(PAD_INCHES))
+
+    # Start node
+    dot.node('START', 'START', shape='circle', style='filled', fillcolor='lightblue')
+
+    # Track edges to avoid duplicates
+    edges = set()
+
+    # Generate FSA structure
+    for morse_code_key, letter in morse_to_letter.items():
+        current_state = 'START'
+        path = ''
+        for symbol in morse_code_key:
+            path += symbol
+            next_state = f'{path}'
+
+            # Add node and edge
+            if (current_state, next_state, symbol) not in edges:
+                dot.node(next_state, f'{path} ({symbol})')
+                dot.edge(current_state, next_state, label=symbol, color='black')
+                edges.add((current_state, next_state, symbol))
+
+            current_state = next_state
+
+        # Final node for the decoded letter
+        final_state = f'{current_state}_decoded'
+        dot.node(final_state, f'{letter}', shape='doublecircle', style='filled', fillcolor='yellow')
+        dot.edge(current_state, final_state, label=f'Decode: {letter}', color='black')
+
+    # Handle space (separation of words)
+    dot.edge('START', 'START', label='/ (space)')
+    dot.edge('START', 'START', label='space')
+    return dot
+
+class DiagramLayout:
+    # A rendered base diagram plus node boxes and edge splines in inches
+    # (origin bottom left) parsed from Graphviz's `plain` output
+    def __init__(self, png, plain):
+        from PIL import Image
+
+        self.image = Image.open(io.BytesIO(png)).convert('RGB')
+        self.nodes = {}
+        self.edges = {}
+        for line in plain.decode('utf-8').splitlines():
+            fields = shlex.split(line)
+            if not fields:
+                continue
+            if fields[0] == 'graph':
+                self.width, self.height = float(fields[2]), float(fields[3])
+            elif fields[0] == 'node':
+                x, y, width, height = map(float, fields[2:6])
+                self.nodes[fields[1]] = (x, y, width, height)
+            elif fields[0] == 'edge':
+                count = int(fields[3])
+                coordinates = list(map(float, fields[4:4 + 2 * count]))
+                points = list(zip(coordinates[0::2], coordinates[1::2]))
+                self.edges.setdefault((fields[1], fields[2]), points)
+        self.scale = self.image.width / (self.width + 2 * PAD_INCHES)
+
+    def to_pixels(self, x, y):
+        return ((x + PAD_INCHES) * self.scale, (self.height - y + PAD_INCHES) * self.scale)
+
+    def spline_pixels(self, points, steps=8):
+        # Sample the piecewise cubic Bezier Graphviz uses for edges
+        pixels = [self.to_pixels(*points[0])]
+        for start in range(0, len(points) - 3, 3):
+            (x0, y0), (x1, y1), (x2, y2), (x3, y3) = points[start:start + 4]
+            for step in range(1, steps + 1):
+                t = step / steps
+                u = 1 - t
+                x = u * u * u * x0 + 3 * u * u * t * x1 + 3 * u * t * t * x2 + t * t * t * x3
+                y = u * u * u * y0 + 3 * u * u * t * y1 + 3 * u * t * t * y2 + t * t * t * y3
+                pixels.append(self.to_pixels(x, y))
+        return pixels
+
+class ImageCache:
+    # LRU of rendered images bounded by their pixel memory; renders run on
+    # worker threads, so access is locked
+    def __init__(self, max_bytes=RENDER_CACHE_BYTES):
+        self.max_bytes = max_bytes
+        self.size = 0
+        self.images = OrderedDict()
+        self.lock = threading.Lock()
+
+    def get(self, key):
+        with self.lock:
+            image = self.images.get(key)
+            if image is not None:
+                self.images.move_to_end(key)
+            return image
+
+    def put(self, key, image):
+        size = image.width * image.height * len(image.getbands())
+        if size > self.max_bytes:
+            return
+        with self.lock:
+            if key in self.images:
+                return
+            self.images[key] = image
+            self.size += size
+            while self.size > self.max_bytes:
+                _, evicted = self.images.popitem(last=False)
+                self.size -= evicted.width * evicted.height * len(evicted.getbands())
+
+    def clear(self):
+        with self.lock:
+            self.images.clear()
+            self.size = 0
+
+render_cache = ImageCache()
+
+@lru_cache(maxsize=8)
+def get_layout(table_items):
+    import graphviz
+
+    # `dot` runs once; its laid-out graph is then drawn as PNG and listed as
+    # coordinates by `neato -n2`, which keeps the given positions and splines
+    laid_out = build_fsa_graph(dict(table_items)).pipe(format='dot')
+    png = graphviz.pipe('neato', 'png', laid_out, neato_no_op=2)
+    plain = graphviz.pipe('neato', 'plain', laid_out, neato_no_op=2)
+    return DiagramLayout(png, plain)
+
+def highlighted_path(morse_to_letter, morse_code):
+    # States the input walks through from START, as in the original diagram:
+    # the walk stops at the first symbol that has no edge in the trie
+    states = ['START']
+    path = ''
+    prefixes = {code[:end] for code in morse_to_letter for end in range(1, len(code) + 1)}
+    for symbol in morse_code:
+        path += symbol
+        if path not in prefixes:
+            return states, False
+        states.append(path)
+    return states, path in morse_to_letter
+
+def render_diagram(table_items, morse_code=None, size=None):
+    # Diagram image for one input, optionally resized; repeated resized
+    # requests for the same input are served from render_cache
+    from PIL import Image, ImageDraw
+
+    key = (table_items, morse_code, size)
+    if size is not None:
+        image = render_cache.get(key)
+        if image is not None:
+            return image
+    layout = get_layout(table_items)
+    image = layout.image
+    if morse_code:
+        image = image.copy()
+        draw = ImageDraw.Draw(image)
+        line_width = max(2, round(layout.scale / 36))
+        states, complete = highlighted_path(dict(table_items), morse_code)
+        for tail, head in zip(states, states[1:]):
+            points = layout.edges.get((tail, head))
+            if points:
+                draw.line(layout.spline_pixels(points), fill=HIGHLIGHT_COLOR, width=line_width)
+        final_state = f'{states[-1]}_decoded'
+        if complete and final_state in layout.nodes:
+            x, y, width, height = layout.nodes[final_state]
+            left, top = layout.to_pixels(x - width / 2, y + height / 2)
+            right, bottom = layout.to_pixels(x + width / 2, y - height / 2)
+            draw.ellipse((left, top, right, bottom), outline=FINAL_STATE_COLOR, width=line_width * 2)
+    if size is not None:
+        image = image.resize(size, Image.Resampling.LANCZOS)
+        render_cache.put(key, image)
+    return image
@@ -0,0 +1,61 @@
+from .tables import get_table
+
+class _Translation(dict):
+    # str.translate table: letters map to their code, whitespace to '/', and
+    # __missing__ decides what happens to characters the code table lacks
+    def __init__(self, mapping, strict):
+        super().__init__(mapping)
+        self.strict = strict
+
+    def __missing__(self, key):
+        # Other case forms of table letters, like the Greek final sigma, are
+        # found through their upper case once and then kept
+        upper = chr(key).upper()
+        if len(upper) == 1 and ord(upper) in self:
+            code = self[key] = self[ord(upper)]
+            return code
+        if self.strict:
+            raise ValueError(f"No Morse code for character {chr(key)!r}")
+        # Dropped from now on without coming back here
+        self[key] = None
+        return None
+
+class MorseEncoder:
+    # Text to Morse in exactly the layout MorseDecoderFSA.decode reads back:
+    # every letter is followed by ' ' and every space becomes '/', so
+    # decode(encode(text)) == text.upper() for text made of table letters
+    # and spaces. The per-character mapping is precomputed once, so encoding
+    # is a single str.translate call. Unknown characters are dropped, or raise
+    # ValueError with errors='strict'.
+    def __init__(self, table=None, errors='ignore'):
+        self.letter_to_morse = get_table(table).letter_to_morse
+        mapping = {}
+        for letter, code in self.letter_to_morse.items():
+            if len(letter) == 1:
+                mapping[ord(letter)] = code + ' '
+                mapping.setdefault(ord(letter.lower()), code + ' ')
+        for whitespace in ' \t\n\r':
+            mapping[ord(whitespace)] = '/'
+        self.translation = _Translation(mapping, errors == 'strict')
+
+    def encode(self, text):
+        # '\r\n' is one line break, so it becomes one '/' like '\n'
+        return text.replace('\r\n', '\n').translate(self.translation)
+
+    def iter_encode(self, stream, chunk_size=65536):
+        # Encode a text file-like object chunk by chunk. Every character maps
+        # on its own, except that a '\r' ending a chunk is held back in case
+        # the next chunk starts with the '\n' of a '\r\n'.
+        pending = ''
+        while True:
+            chunk = stream.read(chunk_size)
+            if not chunk:
+                break
+            chunk = pending + chunk
+            pending = ''
+            if chunk.endswith('\r'):
+                chunk, pending = chunk[:-1], '\r'
+            if chunk:
+                yield self.encode(chunk)
+        if pending:
+            yield self.encode(pending)
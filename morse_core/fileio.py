@@ -0,0 +1,87 @@
+import mmap
+import os
+import struct
+
+from .fsa import MorseDecoderFSA
+from .snapshot import load_snapshot, save_snapshot
+
+READ_BLOCK_SIZE = 1 << 22
+WRITE_BLOCK_SIZE = 1 << 20
+CHECKPOINT_EVERY = 64 << 20
+
+# Appended to the decoder snapshot in a checkpoint: output bytes and
+# characters written when it was taken, then the size and modification time
+# (ns) of the input it belongs to
+_PROGRESS = struct.Struct('<QQQq')
+
+def decode_file(path, output_path, table=None, block_size=READ_BLOCK_SIZE,
+                checkpoint_path=None, checkpoint_every=CHECKPOINT_EVERY):
+    # Decode a Morse file of any size with flat memory use: the input is mapped
+    # rather than read into a str, its bytes are stepped through the compiled
+    # table through zero-copy memoryview blocks, and decoded text is written out
+    # in large blocks.
+    # With checkpoint_path, the decoder state and output length are saved there
+    # every checkpoint_every input bytes; running again after an interruption
+    # truncates the output to the last checkpoint and carries on from there.
+    # The checkpoint is removed once the file is done. A checkpoint that is
+    # damaged or was taken on another or since modified input raises ValueError.
+    # Returns the number of decoded characters written.
+    decoder = MorseDecoderFSA(table=table)
+    written = 0
+    output_size = 0
+    mode = 'wb'
+    source = os.stat(path)
+    if checkpoint_path is not None and os.path.exists(checkpoint_path):
+        snapshot = load_snapshot(checkpoint_path)
+        if len(snapshot) < _PROGRESS.size:
+            raise ValueError("Checkpoint is truncated")
+        output_size, written, input_size, input_mtime = _PROGRESS.unpack_from(snapshot, len(snapshot) - _PROGRESS.size)
+        if (input_size, input_mtime) != (source.st_size, source.st_mtime_ns):
+            raise ValueError("Checkpoint was taken on a different or modified input")
+        decoder.restore(snapshot[:-_PROGRESS.size])
+        mode = 'r+b'
+    pending = []
+    pending_size = 0
+    with open(output_path, mode, buffering=WRITE_BLOCK_SIZE) as output:
+        if mode == 'r+b':
+            output.truncate(output_size)
+            output.seek(output_size)
+        with open(path, 'rb') as file:
+            size = os.fstat(file.fileno()).st_size
+            if decoder.stream_offset < size:
+                with mmap.mmap(file.fileno(), 0, access=mmap.ACCESS_READ) as mapped:
+                    if hasattr(mapped, 'madvise'):
+                        mapped.madvise(mmap.MADV_SEQUENTIAL)
+                    next_checkpoint = decoder.stream_offset + checkpoint_every
+                    with memoryview(mapped) as view:
+                        for start in range(decoder.stream_offset, size, block_size):
+                            # Released even on error, so the map can close
+                            with view[start:start + block_size] as block:
+                                decoded = decoder.feed(block)
+                            pending.append(decoded)
+                            pending_size += len(decoded)
+                            if pending_size >= WRITE_BLOCK_SIZE:
+                                output.write(''.join(pending).encode('utf-8'))
+                                written += pending_size
+                                pending = []
+                                pending_size = 0
+                            if checkpoint_path is not None and decoder.stream_offset >= next_checkpoint:
+                                output.write(''.join(pending).encode('utf-8'))
+                                written += pending_size
+                                pending = []
+                                pending_size = 0
+                                # The output must be on disk before the
+                                # checkpoint that points past it
+                                output.flush()
+                                os.fsync(output.fileno())
+                                progress = _PROGRESS.pack(output.tell(), written, source.st_size, source.st_mtime_ns)
+                                save_snapshot(checkpoint_path, decoder.snapshot() + progress)
+                                next_checkpoint = decoder.stream_offset + checkpoint_every
+            decoded = decoder.flush()
+            pending.append(decoded)
+            pending_size += len(decoded)
+        output.write(''.join(pending).encode('utf-8'))
+        written += pending_size
+    if checkpoint_path is not None and os.path.exists(checkpoint_path):
+        os.remove(checkpoint_path)
+    return written
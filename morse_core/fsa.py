@@ -0,0 +1,176 @@
+import struct
+
+from .batch import decode_batch
+from .beam import decode_tolerant
+from .diagram import render_diagram
+from .metrics import phase
+from .snapshot import KIND_FSA, pack_header, pack_text, table_fingerprint, unpack_fields, unpack_header, unpack_text
+from .tables import get_table
+
+class MorseDecoderFSA:
+    def __init__(self, metrics=None, table=None, cache=None):
+        self.state = 'START'
+        self.current_morse = ''
+        self.decoded_message = []
+        # True while the step-by-step fields are being driven by transition()
+        self.stepping = False
+        self.stream_state = 0
+        self.stream_offset = 0
+        # Optional DecoderMetrics; None keeps the hot paths uninstrumented
+        self.metrics = metrics
+        # Optional DecodeCache for repetitive traffic; may be shared
+        self.cache = cache
+        self.set_table(table)
+
+    def set_table(self, table):
+        # Select the alphabet by registered name, CodeTable or dict. The table
+        # and its compiled trie are shared with every other decoder using it,
+        # so switching is cheap; a pending streamed letter is dropped.
+        self.code_table = get_table(table)
+        self.morse_to_letter = self.code_table.morse_to_letter
+        self.compiled = None
+        self.stream_state = 0
+        self.stream_offset = 0
+
+    def transition(self, symbol):
+        self.stepping = True
+        if self.metrics is not None:
+            self.metrics.symbols += 1
+        if symbol == '.':
+            self.current_morse += symbol
+            self.state = 'DOT'
+        elif symbol == '-':
+            self.current_morse += symbol
+            self.state = 'DASH'
+        elif symbol == ' ':
+            if self.current_morse:
+                self.decode_current_morse()
+            self.state = 'START'
+        elif symbol == '/':
+            if self.current_morse:
+                self.decode_current_morse()
+            self.decoded_message.append(' ')
+            self.state = 'START'
+
+    def decode_current_morse(self):
+        if self.metrics is not None:
+            self.metrics.count_letter(self.current_morse not in self.morse_to_letter)
+        if self.current_morse in self.morse_to_letter:
+            self.decoded_message.append(self.morse_to_letter[self.current_morse])
+        self.current_morse = ''
+
+    def decode(self, morse_code):
+        # Step through the compiled transition table instead of building
+        # self.current_morse one character at a time
+        if self.compiled is None:
+            self.compiled = self.code_table.compiled
+        with phase(self.metrics, 'decode'):
+            if self.cache is not None and isinstance(morse_code, (str, bytes)):
+                self.cache.bind(self.code_table)
+                decoded = self.cache.decode(morse_code, self.compiled, self.metrics)
+            else:
+                decoded = self.compiled.decode(morse_code, self.metrics)
+        self.decoded_message = list(decoded)
+        self.current_morse = ''
+        self.state = 'START'
+        self.stepping = False
+        return decoded
+
+    def decode_batch(self, messages):
+        # Vectorized decode of many short messages at once (requires NumPy)
+        with phase(self.metrics, 'decode_batch'):
+            if self.cache is not None:
+                self.cache.bind(self.code_table)
+                return self.cache.decode_batch(messages, lambda misses: decode_batch(misses, self.code_table))
+            return decode_batch(messages, self.code_table)
+
+    def decode_tolerant(self, morse_code, top_k=5, **options):
+        # Beam-search decode that repairs flipped symbols and missing or extra
+        # letter gaps; returns up to top_k (text, cost) pairs, best first
+        with phase(self.metrics, 'decode_tolerant'):
+            return decode_tolerant(morse_code, top_k, self.code_table, **options)
+
+    def feed(self, chunk):
+        # Streaming decode: the partial letter is kept in self.stream_state across
+        # chunks and every letter completed by a separator is returned right away
+        if self.compiled is None:
+            self.compiled = self.code_table.compiled
+        self.stream_offset += len(chunk)
+        if self.metrics is None:
+            decoded, self.stream_state = self.compiled.run(chunk, self.stream_state)
+        else:
+            with self.metrics.phase('feed'):
+                decoded, self.stream_state = self.compiled.run_counted(chunk, self.stream_state, self.metrics)
+        return decoded
+
+    def flush(self):
+        # End of stream: decode whatever letter is still pending
+        if self.compiled is None:
+            return ''
+        decoded = self.compiled.letters[self.stream_state]
+        if self.metrics is not None:
+            self.compiled.count_pending(self.stream_state, self.metrics)
+        self.stream_state = 0
+        self.stream_offset = 0
+        return decoded
+
+    # Snapshot fields after the header: stream offset, trie state and whether
+    # the step-by-step state, pending code and decoded text follow as strings
+    _SNAPSHOT = struct.Struct('<QIB')
+
+    def snapshot(self):
+        # A streaming job can resume by restoring this and seeking its input
+        # to self.stream_offset, the number of bytes or characters fed so far.
+        # The result of a one-shot decode() is not decoder state and is left out.
+        fields = [
+            pack_header(KIND_FSA, table_fingerprint(self.code_table)),
+            self._SNAPSHOT.pack(self.stream_offset, self.stream_state, self.stepping),
+        ]
+        if self.stepping:
+            fields += [pack_text(self.state), pack_text(self.current_morse), pack_text(''.join(self.decoded_message))]
+        return b''.join(fields)
+
+    def restore(self, snapshot):
+        # Raises ValueError for a damaged snapshot or one from another table
+        offset = unpack_header(snapshot, KIND_FSA, table_fingerprint(self.code_table))
+        (stream_offset, stream_state, stepping), offset = unpack_fields(self._SNAPSHOT, snapshot, offset)
+        state, current_morse, decoded_message = 'START', '', ''
+        if stepping:
+            state, offset = unpack_text(snapshot, offset)
+            current_morse, offset = unpack_text(snapshot, offset)
+            decoded_message, offset = unpack_text(snapshot, offset)
+        self.compiled = self.code_table.compiled
+        if stream_state >= len(self.compiled.letters):
+            raise ValueError("Snapshot state is outside the code table")
+        self.stream_offset = stream_offset
+        self.stream_state = stream_state
+        self.stepping = bool(stepping)
+        self.state = state
+        self.current_morse = current_morse
+        self.decoded_message = list(decoded_message)
+
+    def generate_finite_state_diagram(self, morse_code=None, path='morse_decoder_fsa.png'):
+        # Writes the diagram PNG to `path`. Graphviz lays the diagram out once
+        # per code table; each call only draws the highlighted path over the cache.
+        self.render_finite_state_diagram(morse_code).save(path)
+
+    def render_finite_state_diagram(self, morse_code=None, size=None):
+        # PIL image of the diagram, cached per (code table, input, size)
+        return render_diagram(self.code_table.items, morse_code or None, size)
+
+def iter_decode(stream, decoder=None, chunk_size=65536):
+    # Decode a file-like object (text or binary) chunk by chunk, yielding text
+    # as soon as it is decoded; read1 avoids waiting for a full chunk on pipes
+    if decoder is None:
+        decoder = MorseDecoderFSA()
+    read = getattr(stream, 'read1', stream.read)
+    while True:
+        chunk = read(chunk_size)
+        if not chunk:
+            break
+        decoded = decoder.feed(chunk)
+        if decoded:
+            yield decoded
+    decoded = decoder.flush()
+    if decoded:
+        yield decoded
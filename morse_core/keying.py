@@ -0,0 +1,412 @@
+import wave
+from collections import deque
+
+from .fsa import MorseDecoderFSA
+from .trie import DASH, DOT, LETTER_GAP, WORD_GAP
+
+# Signal front-end: turns key up/down durations or mono PCM audio into the
+# '.', '-', ' ', '/' symbol stream that MorseDecoderFSA consumes. NumPy is
+# imported when a front-end is created, so morse_core itself stays light.
+
+# Standard timing in dot units: mark and gap lengths
+DOT_UNITS, DASH_UNITS = 1, 3
+SYMBOL_GAP_UNITS, LETTER_GAP_UNITS, WORD_GAP_UNITS = 1, 3, 7
+
+# Recent marks the dot and dash lengths are clustered over
+MARK_WINDOW = 32
+
+# With marks of only one length the gaps decide whether they are dots or
+# dashes. Gap ratios of 3 (symbol to letter gap, dot to letter gap) are told
+# apart from 7 / 3 (dash to word gap, letter to word gap) at this ratio.
+GAP_RATIO = 2.7
+
+def dot_seconds(wpm):
+    # PARIS timing: one dot lasts 1.2 / wpm seconds
+    return 1.2 / wpm
+
+class KeyingClassifier:
+    # Classifies complete key-down (mark) and key-up (gap) runs into symbols.
+    # The dot and dash lengths are two cluster centres refined over the last
+    # `window` marks, so the speed follows the sender however the stream is
+    # chunked; gaps are split at 2 and 5 dot units into symbol, letter and
+    # word gaps.
+    def __init__(self, wpm=20, adapt=0.3, window=MARK_WINDOW):
+        import numpy as np
+
+        self.np = np
+        self.dot = dot_seconds(wpm)
+        self.dash = DASH_UNITS * self.dot
+        self.adapt = adapt
+        self.window = window
+        self.marks = deque(maxlen=window)
+        self.gaps = deque(maxlen=window)
+        self.seeded = False
+
+    @property
+    def unit(self):
+        return (self.dot + self.dash / DASH_UNITS) / 2
+
+    @property
+    def wpm(self):
+        return 1.2 / self.unit
+
+    def update(self, marks, gaps=()):
+        # A few rounds of 2-means over the recent marks, seeded with the current
+        # centres, or with the shortest and longest mark once the window first
+        # holds both dots and dashes. Before that, marks of a single length are
+        # placed by the gaps between them (see seed_from_gaps); until one of
+        # the two succeeds the guessed speed stands.
+        np = self.np
+        self.marks.extend(marks)
+        self.gaps.extend(gaps)
+        if not len(marks) and (self.seeded or not self.marks):
+            return
+        marks = np.array(self.marks)
+        dot, dash = self.dot, self.dash
+        if not self.seeded:
+            dot, dash = marks.min(), marks.max()
+            if dash < 2 * dot:
+                self.seed_from_gaps(np.median(marks))
+                return
+        for _ in range(3):
+            is_dash = marks >= (dot + dash) / 2
+            # A cluster with no marks in the window keeps its centre
+            if is_dash.any():
+                dash = marks[is_dash].mean()
+            if not is_dash.all():
+                dot = marks[~is_dash].mean()
+
+        adapt = self.adapt if self.seeded else 1.0
+        self.dot += adapt * (dot - self.dot)
+        self.dash += adapt * (dash - self.dash)
+        self.seeded = True
+
+    def seed_from_gaps(self, mark):
+        # Every mark so far has one length. A shortest gap well under it is the
+        # 1-unit gap inside a letter, so the marks are dashes; a shortest gap
+        # near it is that gap beside dots if some gap is GAP_RATIO times longer
+        # (a letter gap) and otherwise proves nothing; a shortest gap already
+        # GAP_RATIO times the mark only fits dots between letter gaps.
+        if not self.gaps:
+            return
+        gaps = self.np.array(self.gaps)
+        shortest = gaps.min()
+        if 2 * shortest <= mark:
+            unit = mark / DASH_UNITS
+        elif shortest >= GAP_RATIO * mark or (2 * mark > shortest and gaps.max() >= GAP_RATIO * shortest):
+            unit = mark
+        else:
+            return
+        self.dot = DOT_UNITS * unit
+        self.dash = DASH_UNITS * unit
+        self.seeded = True
+
+    def classify_runs(self, key_down, durations, update=True):
+        # One symbol byte per run, 0 where the run produces no symbol
+        np = self.np
+        key_down = np.asarray(key_down, dtype=bool)
+        durations = np.asarray(durations, dtype=np.float64)
+        marks = durations[key_down]
+        if update and len(durations):
+            self.update(marks, durations[~key_down])
+
+        unit = self.unit
+        symbols = np.zeros(len(durations), dtype=np.uint8)
+        symbols[key_down] = np.where(marks < (self.dot + self.dash) / 2, DOT, DASH)
+        gaps = durations[~key_down]
+        symbols[~key_down] = np.where(gaps < 2 * unit, 0, np.where(gaps < 5 * unit, LETTER_GAP, WORD_GAP))
+        return symbols
+
+    def feed(self, key_down, durations):
+        symbols = self.classify_runs(key_down, durations)
+        return symbols[symbols != 0].tobytes().decode('ascii')
+
+class AudioKeyingFrontEnd:
+    # Streaming envelope detector for mono PCM. Each chunk is rectified and
+    # smoothed with a moving average, then sliced with a hysteresis threshold
+    # between a tracked noise level and tone level, and run-length encoded; the
+    # run still open at the end of a chunk is carried into the next one. The
+    # levels move once per fixed-length frame, and a frame is only keyed once
+    # it is complete, so the output does not depend on how the audio is
+    # chunked.
+    def __init__(self, sample_rate, wpm=20, smoothing=0.004, min_run=0.008, frame=0.005, level_time=0.05, min_snr=2.0):
+        import numpy as np
+
+        self.np = np
+        self.sample_rate = sample_rate
+        self.classifier = KeyingClassifier(wpm)
+        self.window = max(1, int(sample_rate * smoothing))
+        self.min_run = max(1, int(sample_rate * min_run))
+        self.frame = max(1, int(sample_rate * frame))
+        # Share of the gap to a new level covered per frame
+        self.level_rate = 1 - np.exp(-self.frame / (sample_rate * level_time))
+        self.min_snr = min_snr
+        # Rectified samples of the last smoothing window and how many of them
+        # are real, and smoothed samples of the frame still being filled
+        self.tail = np.zeros(self.window - 1)
+        self.heard = 0
+        self.pending = np.zeros(0)
+        self.noise = None
+        self.tone = None
+        self.level = False
+        self.run_length = 0
+        self.gap_flagged = False
+        self.seen_mark = False
+        # Runs held back until the classifier has settled on a speed
+        self.held_levels = np.zeros(0, dtype=bool)
+        self.held_durations = np.zeros(0)
+
+    @property
+    def wpm(self):
+        return self.classifier.wpm
+
+    def envelope(self, samples):
+        np = self.np
+        rectified = np.abs(np.asarray(samples, dtype=np.float64))
+        padded = np.concatenate((self.tail, rectified))
+        if self.window > 1:
+            self.tail = padded[-(self.window - 1):]
+        sums = np.cumsum(padded)
+        sums[self.window:] -= sums[:-self.window]
+        # The first samples average over the part of the window heard so far,
+        # so the envelope does not ramp up from the silent initial tail
+        counts = np.minimum(np.arange(self.heard + 1, self.heard + len(rectified) + 1), self.window)
+        self.heard = min(self.heard + len(rectified), self.window)
+        return sums[self.window - 1:] / counts
+
+    def thresholds(self, frame_means):
+        # Upper and lower hysteresis threshold per frame, from the levels
+        # before that frame; NaN while no tone has been heard. Frames well
+        # below the midpoint move the noise level and frames well above it
+        # move the tone level, both ways, so neither a long mark nor a quiet
+        # stretch skews the other.
+        np = self.np
+        low = np.full(len(frame_means), np.nan)
+        high = low.copy()
+        rate = self.level_rate
+        noise, tone = self.noise, self.tone
+        for index, mean in enumerate(frame_means.tolist()):
+            if noise is None:
+                noise = mean
+            if tone is None:
+                # Until the first tone the noise level follows quieter frames at once
+                if mean > self.min_snr * max(noise, 1e-12):
+                    tone = mean
+                else:
+                    noise = min(noise, mean) if mean < noise else noise + rate * (mean - noise)
+                    continue
+            span = tone - noise
+            low[index] = noise + 0.4 * span
+            high[index] = noise + 0.6 * span
+            if mean < noise + 0.3 * span:
+                noise += rate * (mean - noise)
+            elif mean > noise + 0.7 * span:
+                tone += rate * (mean - tone)
+        self.noise, self.tone = noise, tone
+        return low, high
+
+    def key_down(self, envelope):
+        # Key level of every complete frame; the samples of an incomplete one
+        # wait for the next chunk
+        np = self.np
+        envelope = np.concatenate((self.pending, envelope))
+        complete = len(envelope) - len(envelope) % self.frame
+        envelope, self.pending = envelope[:complete], envelope[complete:]
+        if not complete:
+            return np.zeros(0, dtype=bool)
+        low, high = self.thresholds(envelope.reshape(-1, self.frame).mean(axis=1))
+        low, high = np.repeat(low, self.frame), np.repeat(high, self.frame)
+        heard = ~np.isnan(low)
+        above = heard & (envelope > high)
+        below = ~heard | (envelope < low)
+        # Between the two thresholds the key keeps its previous level
+        decided = np.where(above | below, np.arange(len(envelope)), -1)
+        np.maximum.accumulate(decided, out=decided)
+        return np.where(decided >= 0, above[np.maximum(decided, 0)], self.level)
+
+    def feed(self, samples):
+        np = self.np
+        if not len(samples):
+            return ''
+        levels = self.key_down(self.envelope(samples))
+        if not len(levels):
+            return self.early_letter_gap()
+
+        changes = np.flatnonzero(levels[1:] != levels[:-1]) + 1
+        if levels[0] != self.level:
+            changes = np.concatenate(([0], changes))
+        if not len(changes):
+            self.run_length += len(levels)
+            return self.early_letter_gap()
+
+        # Runs that ended inside this chunk; the first one began in an earlier chunk
+        run_ends = changes
+        run_starts = np.concatenate(([0], changes[:-1]))
+        lengths = run_ends - run_starts
+        lengths[0] += self.run_length
+        run_levels = np.where(run_ends > 0, levels[np.maximum(run_ends - 1, 0)], self.level)
+        if run_ends[0] == 0:
+            run_levels[0] = self.level
+        self.level = bool(levels[-1])
+        self.run_length = len(levels) - changes[-1]
+
+        run_levels, lengths = self.debounce(run_levels, lengths)
+        if not len(lengths):
+            return self.early_letter_gap()
+        return self.classify(run_levels, lengths / self.sample_rate) + self.early_letter_gap()
+
+    def classify(self, run_levels, durations, final=False):
+        # Symbols for completed runs. While the speed is still a guess the runs
+        # are held back, so the first letters are not read at the wrong speed;
+        # a window's worth of marks of one kind, or the end, releases them.
+        np = self.np
+        classifier = self.classifier
+        # Silence before the first mark is no gap between elements
+        gaps = ~run_levels
+        if not classifier.marks:
+            marks = np.flatnonzero(run_levels)
+            gaps[:marks[0] if len(marks) else len(gaps)] = False
+        classifier.update(durations[run_levels], durations[gaps])
+        run_levels = np.concatenate((self.held_levels, run_levels))
+        durations = np.concatenate((self.held_durations, durations))
+        if not (classifier.seeded or final or np.count_nonzero(run_levels) >= classifier.window):
+            self.held_levels, self.held_durations = run_levels, durations
+            return ''
+        self.held_levels, self.held_durations = run_levels[:0], durations[:0]
+        if not len(durations):
+            return ''
+
+        symbols = classifier.classify_runs(run_levels, durations, update=False)
+        if self.gap_flagged and symbols[0] == LETTER_GAP:
+            symbols[0] = 0
+        self.gap_flagged = False
+        if not self.seen_mark:
+            # Silence before the first mark separates nothing
+            marks = np.flatnonzero(run_levels)
+            symbols[:marks[0] if len(marks) else len(symbols)] = 0
+            self.seen_mark = bool(len(marks))
+        return symbols[symbols != 0].tobytes().decode('ascii')
+
+    def debounce(self, run_levels, lengths):
+        # Runs shorter than min_run are noise: fold each into the run before it
+        # and merge the neighbours it separated
+        np = self.np
+        keep = lengths >= self.min_run
+        keep[0] = True
+        kept = np.flatnonzero(keep)
+        lengths = np.add.reduceat(lengths, kept)
+        run_levels = run_levels[kept]
+        starts = np.flatnonzero(np.concatenate(([True], run_levels[1:] != run_levels[:-1])))
+        lengths = np.add.reduceat(lengths, starts)
+        run_levels = run_levels[starts]
+        # A glitch just before the open run joins the last completed run to it
+        if run_levels[-1] == self.level:
+            self.run_length += lengths[-1]
+            run_levels, lengths = run_levels[:-1], lengths[:-1]
+        return run_levels, lengths
+
+    def early_letter_gap(self):
+        # Close the letter as soon as the open gap is long enough instead of
+        # waiting for the next mark; a later word gap still follows as '/'
+        if self.level or self.gap_flagged or not self.seen_mark:
+            return ''
+        if self.run_length / self.sample_rate >= 2 * self.classifier.unit:
+            self.gap_flagged = True
+            return ' '
+        return ''
+
+    def flush(self):
+        np = self.np
+        if self.level and self.run_length:
+            symbols = self.classify(np.array([True]), np.array([self.run_length / self.sample_rate]), final=True)
+        else:
+            symbols = self.classify(np.zeros(0, dtype=bool), np.zeros(0), final=True)
+        if self.seen_mark and not self.gap_flagged:
+            symbols += ' '
+        self.level = False
+        self.run_length = 0
+        self.gap_flagged = False
+        self.seen_mark = False
+        return symbols
+
+def read_wav_blocks(path, block_seconds=0.5):
+    # Yield (samples, sample_rate) blocks of a mono PCM WAV file as float arrays
+    import numpy as np
+
+    with wave.open(str(path), 'rb') as wav:
+        channels = wav.getnchannels()
+        width = wav.getsampwidth()
+        rate = wav.getframerate()
+        dtype = {1: np.uint8, 2: np.int16, 4: np.int32}.get(width)
+        if dtype is None:
+            raise ValueError(f"Unsupported sample width: {width * 8} bits")
+        frames_per_block = max(1, int(rate * block_seconds))
+        while True:
+            data = wav.readframes(frames_per_block)
+            if not data:
+                break
+            samples = np.frombuffer(data, dtype=dtype).astype(np.float64)
+            if width == 1:
+                samples -= 128
+            if channels > 1:
+                samples = samples.reshape(-1, channels).mean(axis=1)
+            yield samples, rate
+
+def iter_wav_symbols(path, wpm=20, block_seconds=0.5):
+    front_end = None
+    for samples, rate in read_wav_blocks(path, block_seconds):
+        if front_end is None:
+            front_end = AudioKeyingFrontEnd(rate, wpm)
+        symbols = front_end.feed(samples)
+        if symbols:
+            yield symbols
+    if front_end is not None:
+        yield front_end.flush()
+
+def decode_wav(path, wpm=20, decoder=None):
+    if decoder is None:
+        decoder = MorseDecoderFSA()
+    decoded = [decoder.feed(symbols) for symbols in iter_wav_symbols(path, wpm)]
+    decoded.append(decoder.flush())
+    return ''.join(decoded)
+
+def keying_from_morse(morse_code, wpm=20):
+    # Ideal (key_down, seconds) runs for a symbol string, for synthetic fixtures
+    dot = dot_seconds(wpm)
+    key_down = []
+    durations = []
+    for symbol in morse_code:
+        if symbol in '.-':
+            if key_down and key_down[-1]:
+                key_down.append(False)
+                durations.append(SYMBOL_GAP_UNITS * dot)
+            key_down.append(True)
+            durations.append((DOT_UNITS if symbol == '.' else DASH_UNITS) * dot)
+        elif symbol in ' /':
+            gap = (LETTER_GAP_UNITS if symbol == ' ' else WORD_GAP_UNITS) * dot
+            if key_down and not key_down[-1]:
+                durations[-1] = max(durations[-1], gap)
+            else:
+                key_down.append(False)
+                durations.append(gap)
+    return key_down, durations
+
+def synthesize_audio(morse_code, sample_rate=8000, wpm=20, tone=700.0, noise=0.0, seed=0):
+    # Keyed sine tone (int16) with optional white noise, relative to full scale,
+    # framed by a word gap of silence on both sides like a real recording
+    import numpy as np
+
+    key_down, durations = keying_from_morse('/' + morse_code + '/', wpm)
+    lengths = np.round(np.asarray(durations) * sample_rate).astype(np.intp)
+    gate = np.repeat(np.asarray(key_down, dtype=np.float64), lengths)
+    signal = gate * np.sin(2 * np.pi * tone * np.arange(len(gate)) / sample_rate)
+    if noise:
+        signal += np.random.default_rng(seed).normal(0.0, noise, len(signal))
+    return (np.clip(signal, -1.0, 1.0) * 32767 * 0.8).astype(np.int16)
+
+def write_wav(path, samples, sample_rate):
+    with wave.open(str(path), 'wb') as wav:
+        wav.setnchannels(1)
+        wav.setsampwidth(2)
+        wav.setframerate(sample_rate)
+        wav.writeframes(samples.astype('<i2').tobytes())
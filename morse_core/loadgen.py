@@ -0,0 +1,94 @@
+import argparse
+import asyncio
+import json
+import random
+import time
+
+from .bench import percentiles
+from .encoder import MorseEncoder
+from .server import DEFAULT_HOST, DEFAULT_PORT
+
+# Load generator for morse_core.server. Opens `idle` connections that send
+# nothing, plus `clients` connections that each send `messages` encoded
+# messages one after another and wait for the decoded text to come back, then
+# prints throughput and round-trip latency as JSON:
+#
+#     python -m morse_core.server &
+#     python -m morse_core.loadgen --clients 100 --idle 5000
+#
+# Thousands of sockets may need a higher open-file limit (ulimit -n).
+
+WORDS = ('PARIS', 'CQ', 'DE', 'SOS', 'HELLO', 'WORLD', 'MORSE', 'CODE', 'TEST', '73')
+
+def make_messages(count, seed):
+    rng = random.Random(seed)
+    encoder = MorseEncoder()
+    messages = []
+    for _ in range(count):
+        text = ' '.join(rng.choices(WORDS, k=rng.randint(1, 6))) + ' '
+        # The trailing space encodes as '/', which closes the last letter
+        messages.append((encoder.encode(text).encode('ascii'), len(text.encode('utf-8'))))
+    return messages
+
+async def run_client(host, port, messages, latencies):
+    reader, writer = await asyncio.open_connection(host, port)
+    for data, expected in messages:
+        start = time.perf_counter()
+        writer.write(data)
+        await writer.drain()
+        received = 0
+        while received < expected:
+            chunk = await reader.read(65536)
+            if not chunk:
+                raise ConnectionError("server closed the connection")
+            received += len(chunk)
+        latencies.append((time.perf_counter() - start) * 1e6)
+    writer.write_eof()
+    await reader.read()
+    writer.close()
+    await writer.wait_closed()
+    return sum(len(data) for data, _ in messages)
+
+async def open_idle(host, port, count):
+    connections = []
+    for _ in range(count):
+        connections.append(await asyncio.open_connection(host, port))
+    return connections
+
+async def run(host, port, clients, messages, idle, seed):
+    idle_connections = await open_idle(host, port, idle)
+    latencies = []
+    start = time.perf_counter()
+    sent = await asyncio.gather(*(
+        run_client(host, port, make_messages(messages, seed + client), latencies) for client in range(clients)
+    ))
+    elapsed = time.perf_counter() - start
+    for _, writer in idle_connections:
+        writer.close()
+    for _, writer in idle_connections:
+        await writer.wait_closed()
+    symbols = sum(sent)
+    return {
+        'clients': clients,
+        'idle': idle,
+        'messages': clients * messages,
+        'seconds': elapsed,
+        'symbols_per_second': symbols / elapsed if elapsed else None,
+        'messages_per_second': clients * messages / elapsed if elapsed else None,
+        'latency_us': percentiles(latencies) if latencies else None,
+    }
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Load-test a running morse_core.server.")
+    parser.add_argument('--host', default=DEFAULT_HOST, help="server address")
+    parser.add_argument('--port', type=int, default=DEFAULT_PORT, help="server port")
+    parser.add_argument('--clients', type=int, default=50, help="concurrently sending connections")
+    parser.add_argument('--messages', type=int, default=200, help="messages sent by each client")
+    parser.add_argument('--idle', type=int, default=0, help="extra connections held open without sending")
+    parser.add_argument('--seed', type=int, default=0, help="message generator seed")
+    args = parser.parse_args(argv)
+    report = asyncio.run(run(args.host, args.port, args.clients, args.messages, args.idle, args.seed))
+    print(json.dumps(report, indent=2))
+
+if __name__ == "__main__":
+    main()
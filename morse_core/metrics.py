@@ -0,0 +1,94 @@
+import io
+import time
+from contextlib import contextmanager, nullcontext
+
+# Decoders keep `metrics = None` unless instrumentation is wanted, so the
+# disabled cost is one `is None` check per call (per symbol in the PDAs)
+
+_no_phase = nullcontext()
+
+class DecoderMetrics:
+    # Counters and per-phase timings for one or more decoders. With
+    # profile=True every phase also runs under one shared cProfile profiler,
+    # and with trace_memory=True the tracemalloc peak of each phase is kept.
+    # cProfile and tracemalloc are only imported when asked for.
+    def __init__(self, profile=False, trace_memory=False):
+        self.profiler = None
+        if profile:
+            import cProfile
+
+            self.profiler = cProfile.Profile()
+        self.trace_memory = trace_memory
+        self.tracemalloc = None
+        if trace_memory:
+            import tracemalloc
+
+            self.tracemalloc = tracemalloc
+        self.reset()
+
+    def reset(self):
+        self.symbols = 0
+        self.letters = 0
+        self.unknown_codes = 0
+        self.max_stack_depth = 0
+        self.phase_seconds = {}
+        self.phase_calls = {}
+        self.peak_memory = 0
+
+    def count_letter(self, unknown):
+        if unknown:
+            self.unknown_codes += 1
+        else:
+            self.letters += 1
+
+    def track_stack_depth(self, depth):
+        if depth > self.max_stack_depth:
+            self.max_stack_depth = depth
+
+    @contextmanager
+    def phase(self, name):
+        tracemalloc = self.tracemalloc
+        started_tracing = tracemalloc is not None and not tracemalloc.is_tracing()
+        if started_tracing:
+            tracemalloc.start()
+        elif tracemalloc is not None:
+            tracemalloc.reset_peak()
+        if self.profiler is not None:
+            self.profiler.enable()
+        start = time.perf_counter()
+        try:
+            yield self
+        finally:
+            elapsed = time.perf_counter() - start
+            if self.profiler is not None:
+                self.profiler.disable()
+            if tracemalloc is not None:
+                self.peak_memory = max(self.peak_memory, tracemalloc.get_traced_memory()[1])
+                if started_tracing:
+                    tracemalloc.stop()
+            self.phase_seconds[name] = self.phase_seconds.get(name, 0.0) + elapsed
+            self.phase_calls[name] = self.phase_calls.get(name, 0) + 1
+
+    def profile_report(self, sort='cumulative', limit=20):
+        if self.profiler is None:
+            return ''
+        import pstats
+
+        stream = io.StringIO()
+        pstats.Stats(self.profiler, stream=stream).sort_stats(sort).print_stats(limit)
+        return stream.getvalue()
+
+    def as_dict(self):
+        return {
+            'symbols': self.symbols,
+            'letters': self.letters,
+            'unknown_codes': self.unknown_codes,
+            'max_stack_depth': self.max_stack_depth,
+            'phase_seconds': dict(self.phase_seconds),
+            'phase_calls': dict(self.phase_calls),
+            'peak_memory': self.peak_memory,
+        }
+
+def phase(metrics, name):
+    # Timing context for `metrics`, or a shared no-op when metrics is None
+    return _no_phase if metrics is None else metrics.phase(name)
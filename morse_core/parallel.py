@@ -0,0 +1,101 @@
+import argparse
+import os
+import sys
+from concurrent.futures import ProcessPoolExecutor
+
+from .fsa import MorseDecoderFSA
+from .tables import DEFAULT_TABLE, get_table, table_names
+
+DEFAULT_SHARD_SIZE = 1 << 20
+
+# Each worker process builds one decoder in the pool initializer and reuses it
+# (and its compiled table) for every shard it is handed
+_worker_decoder = None
+
+def _init_worker(morse_to_letter=None):
+    global _worker_decoder
+    _worker_decoder = MorseDecoderFSA(table=morse_to_letter)
+
+def _worker_args(table):
+    # Workers get the table as a plain dict: CodeTable wraps mapping proxies,
+    # which do not pickle, and tables registered at runtime would be missing
+    # from freshly spawned processes
+    return (dict(get_table(table).morse_to_letter),)
+
+def _decode_shard(shard):
+    return _worker_decoder.decode(shard)
+
+def _decode_path(path):
+    with open(path, 'rb') as file:
+        return _worker_decoder.decode(file.read())
+
+def split_shards(morse_code, shard_size=DEFAULT_SHARD_SIZE):
+    # Cut right after a '/' or ' ' so that no letter straddles two shards. A
+    # newline is not a separator for the FSA ('.\n-' decodes as 'A'), so it is
+    # not a safe cut point.
+    if isinstance(morse_code, str):
+        word_gap, letter_gap = '/', ' '
+    else:
+        word_gap, letter_gap = b'/', b' '
+    shards = []
+    start = 0
+    length = len(morse_code)
+    while length - start > shard_size:
+        end = start + shard_size
+        cut = max(morse_code.rfind(word_gap, start, end), morse_code.rfind(letter_gap, start, end))
+        if cut == -1:
+            # No separator inside this shard, so take the next one after it
+            following = [i for i in (morse_code.find(word_gap, end), morse_code.find(letter_gap, end)) if i != -1]
+            if not following:
+                break
+            cut = min(following)
+        shards.append(morse_code[start:cut + 1])
+        start = cut + 1
+    if start < length:
+        shards.append(morse_code[start:])
+    return shards
+
+def decode_parallel(morse_code, jobs=None, shard_size=DEFAULT_SHARD_SIZE, table=None):
+    # Same result as MorseDecoderFSA(table=table).decode(morse_code), spread over processes
+    shards = split_shards(morse_code, shard_size)
+    if len(shards) <= 1:
+        return MorseDecoderFSA(table=table).decode(morse_code)
+    with ProcessPoolExecutor(max_workers=jobs, initializer=_init_worker, initargs=_worker_args(table)) as executor:
+        return ''.join(executor.map(_decode_shard, shards))
+
+def decode_file_parallel(path, jobs=None, shard_size=DEFAULT_SHARD_SIZE, table=None):
+    with open(path, 'rb') as file:
+        morse_code = file.read()
+    return decode_parallel(morse_code, jobs, shard_size, table)
+
+def decode_paths_parallel(paths, jobs=None, table=None):
+    # Decode many transcripts, one file per task; results keep the input order
+    with ProcessPoolExecutor(max_workers=jobs, initializer=_init_worker, initargs=_worker_args(table)) as executor:
+        return list(executor.map(_decode_path, paths, chunksize=16))
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Decode large Morse transcripts on all cores.")
+    parser.add_argument('input', help="Morse file, or a directory of Morse transcripts")
+    parser.add_argument('-o', '--output', help="write decoded text here instead of stdout")
+    parser.add_argument('-j', '--jobs', type=int, default=None, help="worker processes (default: CPU count)")
+    parser.add_argument('--shard-size', type=int, default=DEFAULT_SHARD_SIZE, help="target shard size in bytes")
+    parser.add_argument('--table', default=DEFAULT_TABLE, choices=table_names(), help="code table to decode with")
+    args = parser.parse_args(argv)
+
+    if os.path.isdir(args.input):
+        paths = sorted(
+            os.path.join(args.input, name) for name in os.listdir(args.input)
+            if os.path.isfile(os.path.join(args.input, name))
+        )
+        decoded = '\n'.join(decode_paths_parallel(paths, args.jobs, args.table)) + '\n'
+    else:
+        decoded = decode_file_parallel(args.input, args.jobs, args.shard_size, args.table) + '\n'
+
+    if args.output:
+        with open(args.output, 'w', encoding='utf-8') as file:
+            file.write(decoded)
+    else:
+        sys.stdout.write(decoded)
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,154 @@
+from .metrics import phase
+from .snapshot import KIND_PDA, pack_pda, unpack_pda
+from .tables import get_table
+from .trace import TRACE_FULL, TRACE_SUMMARY, TraceSink
+
+def step_to_end(decoder, cancel_event):
+    # Step either PDA through the rest of its input; False when cancel_event
+    # stopped it first
+    while decoder.current_index < len(decoder.morse_code_sequence):
+        if cancel_event is not None and cancel_event.is_set():
+            decoder.trace.add("Decoding cancelled.")
+            decoder.refresh(force=True)
+            return False
+        decoder.step_decode()
+    return True
+
+class PDAMorseDecoder:
+    def __init__(self, display_callback, stack_callback, trace_level=TRACE_FULL, flush_interval=0.0, metrics=None, table=None):
+        self.stack = []
+        self.current_state = 'START'
+        self.display_callback = display_callback
+        self.update_stack_visual = stack_callback
+        self.decoded_message = ""
+        self.current_index = 0
+        self.morse_code_sequence = ""
+        # Trace lines are buffered and reach display_callback at most once per
+        # flush_interval seconds, together with one stack update
+        self.trace_level = trace_level
+        self.trace = TraceSink(lambda text: self.display_callback(text), self.format_event, flush_interval)
+        # Optional DecoderMetrics; None keeps the per-symbol path uninstrumented
+        self.metrics = metrics
+        # Shared, read-only code table (a registered name, CodeTable or dict)
+        self.code_table = get_table(table)
+        self.morse_to_letter = self.code_table.morse_to_letter
+    
+    def set_input(self, morse_code_sequence):
+        # Initialize or reset PDA state and input sequence
+        self.morse_code_sequence = morse_code_sequence
+        self.current_index = 0
+        self.decoded_message = ""
+        self.stack.clear()
+        self.current_state = 'START'
+        self.trace.add("Ready to decode. Press 'Step' or 'Decode All'.")
+        self.refresh(force=True)
+    
+    def step_decode(self):
+        # Process one symbol at a time and show its effect on the PDA
+        if self.current_index >= len(self.morse_code_sequence):
+            # The end step closes the letter still on the stack, as Decode All does
+            self.decoded_message += self.decode_stack()
+            self.trace.add("End of sequence reached.")
+            self.refresh(force=True)
+            return
+
+        symbol = self.morse_code_sequence[self.current_index]
+        self.current_index += 1
+        self.decoded_message += self.process_symbol(symbol)
+        self.refresh()
+
+    def refresh(self, force=False):
+        # Push buffered trace lines and the current stack to the display
+        if force or self.trace.due():
+            self.trace.flush()
+            self.update_stack_visual(self.stack)
+
+    def process_symbol(self, symbol):
+        # Apply one symbol to the PDA and return the text it completes
+        metrics = self.metrics
+        if metrics is not None:
+            metrics.symbols += 1
+        if symbol == '.' or symbol == '-':
+            # Push . or - to the stack
+            self.stack.append(symbol)
+            if metrics is not None:
+                metrics.track_stack_depth(len(self.stack))
+            self.visualize('Push', symbol)
+            return ""
+        elif symbol == ' ':
+            # A space signifies the end of a letter; decode the letter
+            decoded = self.decode_stack()
+            self.visualize('Space', 'Decode')
+            return decoded
+        elif symbol == '/':
+            # A slash signifies the end of a word; decode and add space
+            decoded = self.decode_stack() + " "
+            self.visualize('Slash', 'New Word')
+            return decoded
+        return ""
+
+    def feed(self, chunk):
+        # Streaming decode: the stack carries a partial letter across chunks and
+        # the decoded text is returned instead of growing self.decoded_message.
+        # Binary chunks are read as ASCII; anything else is an invalid symbol.
+        if not isinstance(chunk, str):
+            chunk = str(chunk, 'ascii', 'replace')
+        decoded = []
+        with phase(self.metrics, 'feed'):
+            for symbol in chunk:
+                decoded.append(self.process_symbol(symbol))
+        self.refresh()
+        return ''.join(decoded)
+
+    def flush(self):
+        # End of stream: decode whatever letter is still on the stack
+        decoded = self.decode_stack()
+        self.refresh(force=True)
+        return decoded
+
+    def snapshot(self):
+        return pack_pda(KIND_PDA, self)
+
+    def restore(self, snapshot):
+        unpack_pda(snapshot, KIND_PDA, self)
+        self.refresh(force=True)
+
+    def decode_all(self, cancel_event=None):
+        # Decode the entire Morse sequence at once; a set cancel_event stops
+        # the run between steps when decoding on a worker thread
+        with phase(self.metrics, 'decode_all'):
+            self.run_to_end(cancel_event)
+
+    def run_to_end(self, cancel_event):
+        if not step_to_end(self, cancel_event):
+            return
+
+        # Final decode of any remaining content in the stack
+        if self.stack:
+            self.decoded_message += self.decode_stack()
+        
+        self.trace.add(f"Final Decoded Message: {self.decoded_message.strip()}")
+        self.refresh(force=True)
+    
+    def decode_stack(self):
+        # Decode the Morse sequence in the stack into an English character
+        if not self.stack:
+            return ""
+        
+        morse_char = ''.join(self.stack)
+        self.stack.clear()  # Clear stack after decoding
+        decoded_char = self.morse_to_letter.get(morse_char, '?')  # Use '?' if character not found
+        if self.metrics is not None:
+            self.metrics.count_letter(morse_char not in self.morse_to_letter)
+        self.visualize('Decode', decoded_char)
+        return decoded_char
+    
+    def visualize(self, action, detail):
+        # Record detailed actions taken by the PDA; the summary level keeps
+        # only decoded letters and the off level keeps nothing
+        if self.trace_level == TRACE_FULL or (self.trace_level == TRACE_SUMMARY and action == 'Decode'):
+            self.trace.add((action, detail, tuple(self.stack), self.current_state))
+
+    def format_event(self, event):
+        action, detail, stack, state = event
+        return f"Action: {action} | Detail: {detail} | Stack: {list(stack)} | State: {state}"
@@ -0,0 +1,139 @@
+from .metrics import phase
+from .pda import step_to_end
+from .snapshot import KIND_CANVAS_PDA, pack_pda, unpack_pda
+from .tables import get_table
+from .trace import TRACE_FULL, TRACE_OFF, TraceSink
+
+class PDAMorseDecoder:
+    def __init__(self, display_callback, update_stack_visual, update_letter_stack_visual, update_state_visual,
+                 trace_level=TRACE_FULL, flush_interval=0.0, metrics=None, table=None):
+        self.stack = []
+        self.letter_stack = []
+        self.decoded_message = ""
+        self.morse_code_sequence = ""
+        self.current_index = 0
+        self.current_state = "START"
+        self.display_callback = display_callback
+        self.update_stack_visual = update_stack_visual
+        self.update_letter_stack_visual = update_letter_stack_visual
+        self.update_state_visual = update_state_visual
+        # Trace lines and canvas updates are buffered and pushed at most once
+        # per flush_interval seconds
+        self.trace_level = trace_level
+        self.trace = TraceSink(lambda text: self.display_callback(text), self.format_event, flush_interval)
+        self.letters_changed = False
+        # Optional DecoderMetrics; None keeps the per-symbol path uninstrumented
+        self.metrics = metrics
+        # Shared, read-only code table (a registered name, CodeTable or dict)
+        self.code_table = get_table(table)
+        self.morse_to_letter = self.code_table.morse_to_letter
+
+    def set_input(self, morse_code_sequence):
+        self.morse_code_sequence = morse_code_sequence.strip()
+        self.current_index = 0
+        self.decoded_message = ""
+        self.stack = []
+        self.letter_stack = []
+        self.current_state = "START"
+        self.trace.add("Ready to decode. Press 'Step' or 'Decode All'.")
+        self.letters_changed = True
+        self.refresh(force=True)
+
+    def step_decode(self):
+        if self.current_index >= len(self.morse_code_sequence):
+            if self.stack:
+                decoded_char = self.decode_stack()
+                self.decoded_message += decoded_char
+                self.letter_stack.append(decoded_char)
+                self.letters_changed = True
+            self.current_state = "END"
+            self.trace.add("End of sequence reached.")
+            self.refresh(force=True)
+            return
+
+        symbol = self.morse_code_sequence[self.current_index]
+        self.current_index += 1
+        metrics = self.metrics
+        if metrics is not None:
+            metrics.symbols += 1
+
+        if symbol in '.-':
+            self.stack.append(symbol)
+            if metrics is not None:
+                metrics.track_stack_depth(len(self.stack))
+            self.current_state = "READ_SYMBOL"
+            action = 'Push'
+        elif symbol == ' ':
+            if self.stack:
+                decoded_char = self.decode_stack()
+                self.decoded_message += decoded_char
+                self.letter_stack.append(decoded_char)
+                self.letters_changed = True
+            self.current_state = "SPACE"
+            action = 'Space'
+        elif symbol == '/':
+            if self.stack:
+                decoded_char = self.decode_stack()
+                self.decoded_message += decoded_char
+                self.letter_stack.append(decoded_char)
+                self.letters_changed = True
+            self.decoded_message += ' '
+            self.letter_stack.append(' ')
+            self.current_state = "SLASH"
+            self.letters_changed = True
+            action = 'Slash'
+        else:
+            action = 'Invalid'
+            symbol = f"Invalid symbol '{symbol}' ignored"
+            self.current_state = "ERROR"
+
+        if self.trace_level == TRACE_FULL:
+            self.trace.add(('Action', action, symbol))
+        self.refresh()
+
+    def refresh(self, force=False):
+        # Push buffered trace lines and the latest stack, tape and state
+        if force or self.trace.due():
+            self.trace.flush()
+            self.update_stack_visual(self.stack)
+            if self.letters_changed:
+                self.letters_changed = False
+                self.update_letter_stack_visual(self.letter_stack)
+            self.update_state_visual(self.current_state)
+
+    def format_event(self, event):
+        kind, first, second = event
+        if kind == 'Action':
+            return f"Action: {first} | Symbol: {second}"
+        return f"Decoded: {first} from {second}"
+
+    def decode_stack(self):
+        if not self.stack:
+            return ""
+        morse_char = ''.join(self.stack)
+        self.stack = []
+        decoded_char = self.morse_to_letter.get(morse_char, '?')
+        if self.metrics is not None:
+            self.metrics.count_letter(morse_char not in self.morse_to_letter)
+        self.current_state = "DECODE"
+        if self.trace_level != TRACE_OFF:
+            self.trace.add(('Decoded', decoded_char, morse_char))
+        return decoded_char
+
+    # The letter tape follows the shared PDA fields, '\0'-separated
+    def snapshot(self):
+        return pack_pda(KIND_CANVAS_PDA, self, '\0'.join(self.letter_stack))
+
+    def restore(self, snapshot):
+        letters, = unpack_pda(snapshot, KIND_CANVAS_PDA, self, extra=1)
+        self.letter_stack = letters.split('\0') if letters else []
+        self.letters_changed = True
+        self.refresh(force=True)
+
+    def decode_all(self, cancel_event=None):
+        with phase(self.metrics, 'decode_all'):
+            self.run_to_end(cancel_event)
+
+    def run_to_end(self, cancel_event):
+        if step_to_end(self, cancel_event):
+            self.refresh(force=True)
@@ -0,0 +1,138 @@
+from array import array
+from bisect import bisect_right
+
+from .trace import TRACE_OFF
+
+# Recorded execution of a PDA decoder for step-through replay. Step s is the
+# decoder after s calls to step_decode() on its input, so steps run from 0
+# (input just set) to len(input) + 1 (the end-of-sequence step). Every step
+# is logged as one entry in four parallel arrays:
+#
+#     input index, action, stack depth after the step, emitted text id
+#
+# and every `checkpoint_interval` steps the decoder's position, state and
+# stack are kept. Jumping to any step is a bisect over the checkpoints plus
+# at most checkpoint_interval - 1 headless steps, and the decoded text at a
+# step is a prefix of the recorded output, so going backward or scrubbing
+# never replays from the start. Recording is lazy: steps are only recorded
+# as far as a seek has needed them.
+
+ACTION_PUSH, ACTION_SPACE, ACTION_SLASH, ACTION_INVALID, ACTION_END = range(5)
+ACTION_NAMES = ('Push', 'Space', 'Slash', 'Invalid', 'End')
+
+CHECKPOINT_INTERVAL = 256
+
+_SYMBOL_ACTIONS = {'.': ACTION_PUSH, '-': ACTION_PUSH, ' ': ACTION_SPACE, '/': ACTION_SLASH}
+
+def headless_copy(decoder):
+    # A decoder of the same kind over the same input with no-op callbacks and
+    # tracing off
+    ignore = lambda *args: None
+    cls = type(decoder)
+    if hasattr(decoder, 'letter_stack'):
+        copy = cls(ignore, ignore, ignore, ignore, TRACE_OFF, table=decoder.morse_to_letter)
+    else:
+        copy = cls(ignore, ignore, TRACE_OFF, table=decoder.morse_to_letter)
+    copy.set_input(decoder.morse_code_sequence)
+    return copy
+
+class ExecutionTrace:
+    def __init__(self, decoder, checkpoint_interval=CHECKPOINT_INTERVAL):
+        # `recorder` only ever moves forward and holds the output recorded so
+        # far; `player` is moved to whatever step is asked for
+        self.recorder = headless_copy(decoder)
+        self.player = headless_copy(decoder)
+        self.checkpoint_interval = checkpoint_interval
+        self.final_step = len(self.recorder.morse_code_sequence) + 1
+        self.has_letters = hasattr(self.recorder, 'letter_stack')
+
+        self.indices = array('I')
+        self.actions = array('B')
+        self.depths = array('I')
+        self.emitted = array('I')
+        self.texts = ['']
+        self.text_ids = {'': 0}
+        # Output length (and letter tape length) at each step, from step 0
+        self.output_lengths = array('I', [0])
+        self.letter_counts = array('I', [0])
+        self.checkpoint_steps = array('I')
+        self.checkpoints = []
+        self.add_checkpoint(0, self.recorder)
+
+    @property
+    def steps(self):
+        # Number of steps recorded so far
+        return len(self.actions)
+
+    def add_checkpoint(self, step, decoder):
+        self.checkpoint_steps.append(step)
+        self.checkpoints.append((decoder.current_index, decoder.current_state, ''.join(decoder.stack)))
+
+    def record_until(self, step):
+        recorder = self.recorder
+        sequence = recorder.morse_code_sequence
+        step = min(step, self.final_step)
+        while self.steps < step:
+            index = recorder.current_index
+            if index < len(sequence):
+                action = _SYMBOL_ACTIONS.get(sequence[index], ACTION_INVALID)
+            else:
+                action = ACTION_END
+            before = len(recorder.decoded_message)
+            recorder.step_decode()
+            text = recorder.decoded_message[before:]
+            text_id = self.text_ids.get(text)
+            if text_id is None:
+                text_id = self.text_ids[text] = len(self.texts)
+                self.texts.append(text)
+            self.indices.append(index)
+            self.actions.append(action)
+            self.depths.append(len(recorder.stack))
+            self.emitted.append(text_id)
+            self.output_lengths.append(len(recorder.decoded_message))
+            if self.has_letters:
+                self.letter_counts.append(len(recorder.letter_stack))
+            if self.steps % self.checkpoint_interval == 0:
+                self.add_checkpoint(self.steps, recorder)
+
+    def event(self, step):
+        # (input index, action name, stack depth, emitted text) of step >= 1
+        self.record_until(step)
+        position = step - 1
+        return (self.indices[position], ACTION_NAMES[self.actions[position]],
+                self.depths[position], self.texts[self.emitted[position]])
+
+    def seek(self, decoder, step):
+        # Put `decoder` (the one driving the widgets) into its state at `step`
+        # and refresh its display once; returns the step actually reached
+        if len(decoder.morse_code_sequence) != self.final_step - 1:
+            raise ValueError("Trace was recorded on a different input")
+        step = max(0, min(step, self.final_step))
+        self.record_until(step)
+        position = bisect_right(self.checkpoint_steps, step) - 1
+        checkpoint_step = self.checkpoint_steps[position]
+        index, state, stack = self.checkpoints[position]
+
+        # The player only works out the position, state and stack; the text
+        # it would emit is already recorded
+        player = self.player
+        player.current_index = index
+        player.current_state = state
+        player.stack = list(stack)
+        player.decoded_message = ''
+        if self.has_letters:
+            player.letter_stack = []
+        for _ in range(step - checkpoint_step):
+            player.step_decode()
+
+        # Fields are set on the decoder directly rather than through a
+        # snapshot, which would encode and decode the whole output again
+        decoder.current_index = player.current_index
+        decoder.current_state = player.current_state
+        decoder.stack[:] = player.stack
+        decoder.decoded_message = self.recorder.decoded_message[:self.output_lengths[step]]
+        if self.has_letters:
+            decoder.letter_stack = self.recorder.letter_stack[:self.letter_counts[step]]
+            decoder.letters_changed = True
+        decoder.refresh(force=True)
+        return step
@@ -0,0 +1,140 @@
+import argparse
+import asyncio
+import sys
+import time
+
+from .session import MorseSession
+from .tables import DEFAULT_TABLE, table_names
+
+# Decoding over TCP. Every connection gets its own streaming session: bytes
+# of Morse ('.', '-', ' ', '/') go in, UTF-8 text comes back as soon as each
+# letter is closed by a separator, and the last pending letter is sent when
+# the client shuts down its side of the connection.
+#
+# The server is built on asyncio.Protocol rather than streams, so an idle
+# session is only its transport, a slotted protocol object and a compact
+# MorseSession. When a client stops reading and the outgoing buffer fills up,
+# reading from that client is paused until the buffer drains again
+# (backpressure).
+#
+#     python -m morse_core.server --port 8765
+
+DEFAULT_HOST = '127.0.0.1'
+DEFAULT_PORT = 8765
+
+class ServerStats:
+    def __init__(self):
+        self.sessions = 0
+        self.active = 0
+        self.peak_active = 0
+        self.bytes_in = 0
+        self.bytes_out = 0
+        self.paused = 0
+
+    def as_dict(self):
+        return {
+            'sessions': self.sessions,
+            'active': self.active,
+            'peak_active': self.peak_active,
+            'bytes_in': self.bytes_in,
+            'bytes_out': self.bytes_out,
+            'paused': self.paused,
+        }
+
+class MorseSessionProtocol(asyncio.Protocol):
+    __slots__ = ('session', 'stats', 'transport')
+
+    def __init__(self, table, stats):
+        self.session = MorseSession(table)
+        self.stats = stats
+        self.transport = None
+
+    def connection_made(self, transport):
+        self.transport = transport
+        stats = self.stats
+        stats.sessions += 1
+        stats.active += 1
+        stats.peak_active = max(stats.peak_active, stats.active)
+
+    def data_received(self, data):
+        self.stats.bytes_in += len(data)
+        self.session.feed(data)
+        self.send()
+
+    def eof_received(self):
+        self.session.flush()
+        self.send()
+        # Returning a false value closes the transport once it has written
+        # everything still buffered
+        return False
+
+    def connection_lost(self, exc):
+        self.stats.active -= 1
+        self.transport = None
+
+    def send(self):
+        if self.session.output:
+            data = self.session.take()
+            self.stats.bytes_out += len(data)
+            self.transport.write(data)
+
+    # Called by the transport around its write buffer high/low water marks
+    def pause_writing(self):
+        self.stats.paused += 1
+        self.transport.pause_reading()
+
+    def resume_writing(self):
+        self.transport.resume_reading()
+
+async def start_server(host=DEFAULT_HOST, port=DEFAULT_PORT, table=None, stats=None, backlog=1024):
+    # Returns (asyncio server, stats); the server is already listening
+    loop = asyncio.get_running_loop()
+    if stats is None:
+        stats = ServerStats()
+    server = await loop.create_server(
+        lambda: MorseSessionProtocol(table, stats), host, port, backlog=backlog
+    )
+    return server, stats
+
+def memory_usage_kb():
+    # Peak resident set size of this process, where the platform reports it
+    try:
+        import resource
+    except ImportError:
+        return None
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # ru_maxrss is in bytes on macOS and in kilobytes elsewhere
+    return peak // 1024 if sys.platform == 'darwin' else peak
+
+async def report_stats(stats, interval):
+    while True:
+        await asyncio.sleep(interval)
+        line = ' '.join(f'{key}={value}' for key, value in stats.as_dict().items())
+        print(f'{time.strftime("%H:%M:%S")} {line} peak_rss_kb={memory_usage_kb()}', file=sys.stderr)
+
+async def serve(host, port, table, stats_interval):
+    server, stats = await start_server(host, port, table)
+    address = ', '.join(str(sock.getsockname()) for sock in server.sockets)
+    print(f'Decoding Morse on {address}', file=sys.stderr)
+    reporter = asyncio.ensure_future(report_stats(stats, stats_interval)) if stats_interval else None
+    try:
+        async with server:
+            await server.serve_forever()
+    finally:
+        if reporter is not None:
+            reporter.cancel()
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Serve streaming Morse decoding over TCP.")
+    parser.add_argument('--host', default=DEFAULT_HOST, help="address to listen on")
+    parser.add_argument('--port', type=int, default=DEFAULT_PORT, help="port to listen on")
+    parser.add_argument('--table', default=DEFAULT_TABLE, choices=table_names(), help="code table to decode with")
+    parser.add_argument('--stats-interval', type=float, default=0, help="print session counts every N seconds")
+    args = parser.parse_args(argv)
+    try:
+        asyncio.run(serve(args.host, args.port, args.table, args.stats_interval))
+    except KeyboardInterrupt:
+        pass
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,109 @@
+import struct
+
+from .snapshot import KIND_SESSION, pack_header, pack_text, table_fingerprint, unpack_bytes, unpack_fields, unpack_header
+from .tables import get_table
+from .trie import DASH, DOT, LETTER_GAP, WORD_GAP
+
+# Compact streaming state for servers that hold very many open decoders.
+# The letter in progress is one small int, a sentinel bit above its dot/dash
+# pattern (dash = 1), so '.-' is 0b101 and the empty letter is 1. That int
+# indexes straight into a per-table list of UTF-8 encoded letters, and decoded
+# bytes collect in one bytearray per session. With the shared table, a
+# session is a three-slot object plus its (usually empty) output buffer.
+
+class PackedTable:
+    # Letters indexed by packed code. Codes longer than the longest letter in
+    # the table saturate at `limit`, whose entry is empty, so an unknown long
+    # run decodes to nothing like in the FSA.
+    def __init__(self, code_table):
+        morse_to_letter = code_table.morse_to_letter
+        self.fingerprint = table_fingerprint(code_table)
+        max_length = max(len(code) for code in morse_to_letter)
+        self.limit = 1 << (max_length + 1)
+        self.letters = [b''] * (self.limit + 1)
+        for code, letter in morse_to_letter.items():
+            self.letters[pack_code(code)] = letter.encode('utf-8')
+        self.word_letters = [letter + b' ' for letter in self.letters]
+
+_packed_tables = {}
+_SNAPSHOT_CODE = struct.Struct('<Q')
+
+def get_packed_table(table=None):
+    code_table = get_table(table)
+    packed = _packed_tables.get(code_table.items)
+    if packed is None:
+        packed = _packed_tables[code_table.items] = PackedTable(code_table)
+    return packed
+
+def pack_code(code):
+    packed = 1
+    for symbol in code:
+        packed = packed << 1 | (symbol == '-')
+    return packed
+
+def unpack_code(packed):
+    return ''.join('-' if bit == '1' else '.' for bit in bin(packed)[3:])
+
+class MorseSession:
+    __slots__ = ('code', 'table', 'output')
+
+    def __init__(self, table=None):
+        self.code = 1
+        self.table = get_packed_table(table)
+        self.output = bytearray()
+
+    def feed(self, chunk):
+        # Decode a chunk of Morse (str or bytes-like), appending the UTF-8 of
+        # every letter closed by a separator to self.output
+        if isinstance(chunk, str):
+            chunk = chunk.encode('ascii', 'ignore')
+        table = self.table
+        letters = table.letters
+        word_letters = table.word_letters
+        limit = table.limit
+        output = self.output
+        code = self.code
+        for byte in chunk:
+            if byte == DOT:
+                code = code << 1 if code < limit else limit
+            elif byte == DASH:
+                code = code << 1 | 1 if code < limit else limit
+            elif byte == LETTER_GAP:
+                output += letters[min(code, limit)]
+                code = 1
+            elif byte == WORD_GAP:
+                output += word_letters[min(code, limit)]
+                code = 1
+        self.code = code
+        return output
+
+    def flush(self):
+        # End of stream: decode the pending letter
+        self.output += self.table.letters[min(self.code, self.table.limit)]
+        self.code = 1
+        return self.output
+
+    def take(self):
+        # Decoded bytes so far; the buffer is emptied for reuse
+        data = bytes(self.output)
+        del self.output[:]
+        return data
+
+    def snapshot(self):
+        # Output not yet taken is kept. The pending code only means the same
+        # letters (and fits under the same limit) with the same table, so the
+        # table fingerprint is checked like for the FSA.
+        header = pack_header(KIND_SESSION, self.table.fingerprint)
+        return header + _SNAPSHOT_CODE.pack(self.code) + pack_text(self.output)
+
+    def restore(self, snapshot):
+        # Raises ValueError for a damaged snapshot or one from another table
+        offset = unpack_header(snapshot, KIND_SESSION, self.table.fingerprint)
+        (code,), offset = unpack_fields(_SNAPSHOT_CODE, snapshot, offset)
+        output, offset = unpack_bytes(snapshot, offset)
+        self.code = max(1, min(code, self.table.limit))
+        self.output[:] = output
+
+    @property
+    def current_morse(self):
+        return unpack_code(self.code) if self.code < self.table.limit else None
@@ -0,0 +1,112 @@
+import os
+import struct
+import zlib
+
+# Binary decoder snapshots. A snapshot is a fixed header
+#
+#     magic b'MSNP', format version, decoder kind, code-table fingerprint
+#
+# followed by the decoder's own fields: fixed-size integers packed with
+# struct and length-prefixed UTF-8 strings. Snapshots never include the
+# input itself, only how far into it the decoder got, so they stay a few
+# dozen bytes for a streaming decoder and can be taken every few megabytes.
+
+MAGIC = b'MSNP'
+VERSION = 1
+
+KIND_FSA = 1
+KIND_SESSION = 2
+KIND_PDA = 3
+KIND_CANVAS_PDA = 4
+
+_HEADER = struct.Struct('<4sBBI')
+_LENGTH = struct.Struct('<I')
+# PDA fields after the header: input length and position, then the state,
+# stack and decoded text as strings, then any strings of the decoder's own
+_PDA_POSITION = struct.Struct('<QQ')
+
+def table_fingerprint(code_table):
+    # Compiled trie states only mean something for the table they came from
+    return zlib.crc32(repr(code_table.items).encode('utf-8'))
+
+def pack_header(kind, fingerprint=0):
+    return _HEADER.pack(MAGIC, VERSION, kind, fingerprint)
+
+def unpack_header(data, kind, fingerprint=0):
+    # Check the header and return the offset of the first field
+    if len(data) < _HEADER.size:
+        raise ValueError("Snapshot is truncated")
+    magic, version, found_kind, found_fingerprint = _HEADER.unpack_from(data)
+    if magic != MAGIC:
+        raise ValueError("Not a decoder snapshot")
+    if version != VERSION:
+        raise ValueError(f"Unsupported snapshot version {version}")
+    if found_kind != kind:
+        raise ValueError(f"Snapshot is for decoder kind {found_kind}, not {kind}")
+    if found_fingerprint != fingerprint:
+        raise ValueError("Snapshot was taken with a different code table")
+    return _HEADER.size
+
+def unpack_fields(layout, data, offset):
+    # struct.unpack_from that reports a short snapshot as ValueError; returns
+    # the fields and the offset just past them
+    try:
+        return layout.unpack_from(data, offset), offset + layout.size
+    except struct.error:
+        raise ValueError("Snapshot is truncated") from None
+
+def pack_text(text):
+    data = text.encode('utf-8') if isinstance(text, str) else bytes(text)
+    return _LENGTH.pack(len(data)) + data
+
+def unpack_bytes(data, offset):
+    (length,), offset = unpack_fields(_LENGTH, data, offset)
+    if offset + length > len(data):
+        raise ValueError("Snapshot is truncated")
+    return bytes(data[offset:offset + length]), offset + length
+
+def unpack_text(data, offset):
+    value, offset = unpack_bytes(data, offset)
+    return value.decode('utf-8'), offset
+
+def pack_pda(kind, decoder, *extra):
+    # The input itself is not stored; unpack_pda() expects set_input() to
+    # have been given the same sequence again, under the same code table
+    return b''.join((
+        pack_header(kind, table_fingerprint(decoder.code_table)),
+        _PDA_POSITION.pack(len(decoder.morse_code_sequence), decoder.current_index),
+        pack_text(decoder.current_state),
+        pack_text(''.join(decoder.stack)),
+        pack_text(decoder.decoded_message),
+        *map(pack_text, extra),
+    ))
+
+def unpack_pda(data, kind, decoder, extra=0):
+    # Restore the shared PDA fields onto `decoder` and return its `extra`
+    # strings; nothing is changed if the snapshot does not fit
+    offset = unpack_header(data, kind, table_fingerprint(decoder.code_table))
+    (length, current_index), offset = unpack_fields(_PDA_POSITION, data, offset)
+    if length != len(decoder.morse_code_sequence):
+        raise ValueError("Snapshot was taken on a different input")
+    fields = []
+    for _ in range(3 + extra):
+        value, offset = unpack_text(data, offset)
+        fields.append(value)
+    decoder.current_index = current_index
+    decoder.current_state, stack, decoder.decoded_message = fields[:3]
+    decoder.stack[:] = stack
+    return fields[3:]
+
+def save_snapshot(path, snapshot):
+    # Write to a temporary file and rename it over `path`, so a crash while
+    # checkpointing leaves the previous snapshot intact
+    temporary = f'{path}.tmp'
+    with open(temporary, 'wb') as file:
+        file.write(snapshot)
+        file.flush()
+        os.fsync(file.fileno())
+    os.replace(temporary, path)
+
+def load_snapshot(path):
+    with open(path, 'rb') as file:
+        return file.read()
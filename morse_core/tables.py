@@ -0,0 +1,109 @@
+from types import MappingProxyType
+
+from .trie import compile_morse_table
+
+# Morse Code dictionary for reference
+morse_code_dict = {
+    '.-': 'A', '-...': 'B', '-.-.': 'C', '-..': 'D', '.': 'E', '..-.': 'F', '--.': 'G',
+    '....': 'H', '..': 'I', '.---': 'J', '-.-': 'K', '.-..': 'L', '--': 'M', '-.': 'N',
+    '---': 'O', '.--.': 'P', '--.-': 'Q', '.-.': 'R', '...': 'S', '-': 'T', '..-': 'U',
+    '...-': 'V', '.--': 'W', '-..-': 'X', '-.--': 'Y', '--..': 'Z', '-----': '0',
+    '.----': '1', '..---': '2', '...--': '3', '....-': '4', '.....': '5', '-....': '6',
+    '--...': '7', '---..': '8', '----.': '9'
+}
+
+DIGITS = {code: letter for code, letter in morse_code_dict.items() if letter.isdigit()}
+
+# ITU punctuation
+PUNCTUATION = {
+    '.-.-.-': '.', '--..--': ',', '..--..': '?', '.----.': "'", '-.-.--': '!', '-..-.': '/',
+    '-.--.': '(', '-.--.-': ')', '.-...': '&', '---...': ':', '-.-.-.': ';', '-...-': '=',
+    '.-.-.': '+', '-....-': '-', '..--.-': '_', '.-..-.': '"', '...-..-': '$', '.--.-.': '@',
+}
+
+# Procedural signals, written as their letters in angle brackets. AR, BT and
+# AS share their codes with '+', '=' and '&', so they live in a table of their
+# own, where they take those codes over and the three marks have none.
+PROSIGNS = {
+    '.-.-.': '<AR>', '-...-': '<BT>', '...-.-': '<SK>', '...---...': '<SOS>',
+    '-.-.-': '<KA>', '...-.': '<VE>', '.-...': '<AS>', '........': '<HH>',
+}
+
+# Russian Morse
+CYRILLIC = {
+    '.-': 'А', '-...': 'Б', '.--': 'В', '--.': 'Г', '-..': 'Д', '.': 'Е', '...-': 'Ж',
+    '--..': 'З', '..': 'И', '.---': 'Й', '-.-': 'К', '.-..': 'Л', '--': 'М', '-.': 'Н',
+    '---': 'О', '.--.': 'П', '.-.': 'Р', '...': 'С', '-': 'Т', '..-': 'У', '..-.': 'Ф',
+    '....': 'Х', '-.-.': 'Ц', '---.': 'Ч', '----': 'Ш', '--.-': 'Щ', '--.--': 'Ъ',
+    '-.--': 'Ы', '-..-': 'Ь', '..-..': 'Э', '..--': 'Ю', '.-.-': 'Я',
+}
+
+# Greek Morse
+GREEK = {
+    '.-': 'Α', '-...': 'Β', '--.': 'Γ', '-..': 'Δ', '.': 'Ε', '--..': 'Ζ', '....': 'Η',
+    '-.-.': 'Θ', '..': 'Ι', '-.-': 'Κ', '.-..': 'Λ', '--': 'Μ', '-.': 'Ν', '-..-': 'Ξ',
+    '---': 'Ο', '.--.': 'Π', '.-.': 'Ρ', '...': 'Σ', '-': 'Τ', '-.--': 'Υ', '..-.': 'Φ',
+    '----': 'Χ', '--.-': 'Ψ', '.--': 'Ω',
+}
+
+DEFAULT_TABLE = 'itu'
+
+class CodeTable:
+    # One alphabet, shared read-only by every decoder and encoder that selects
+    # it. The flat transition table is compiled on first use and then kept,
+    # so each symbol is still one list lookup however large the table grows.
+    def __init__(self, name, morse_to_letter):
+        self.name = name
+        self.morse_to_letter = MappingProxyType(dict(morse_to_letter))
+        # Reverse map for encoding; the first code listed for a letter wins
+        letter_to_morse = {}
+        for code, letter in self.morse_to_letter.items():
+            letter_to_morse.setdefault(letter, code)
+        self.letter_to_morse = MappingProxyType(letter_to_morse)
+        self.items = tuple(self.morse_to_letter.items())
+        self._compiled = None
+
+    @property
+    def compiled(self):
+        if self._compiled is None:
+            self._compiled = compile_morse_table(self.morse_to_letter)
+        return self._compiled
+
+    def __repr__(self):
+        return f'CodeTable({self.name!r}, {len(self.items)} codes)'
+
+_tables = {}
+# Tables built from plain dicts passed by callers, keyed by their items
+_anonymous_tables = {}
+
+def register_table(name, morse_to_letter):
+    # Add or replace an alphabet; decoders created afterwards can select it by name
+    table = _tables[name] = CodeTable(name, morse_to_letter)
+    return table
+
+def get_table(table=None):
+    # Accepts a registered name, a CodeTable, a {code: letter} mapping, or None
+    # for the default table
+    if table is None:
+        table = DEFAULT_TABLE
+    if isinstance(table, CodeTable):
+        return table
+    if isinstance(table, str):
+        try:
+            return _tables[table]
+        except KeyError:
+            raise ValueError(f"Unknown code table {table!r}; choose from {', '.join(_tables)}") from None
+    key = tuple(table.items())
+    code_table = _anonymous_tables.get(key)
+    if code_table is None:
+        code_table = _anonymous_tables[key] = CodeTable(None, table)
+    return code_table
+
+def table_names():
+    return list(_tables)
+
+register_table('itu', morse_code_dict)
+register_table('itu-extended', {**morse_code_dict, **PUNCTUATION})
+register_table('itu-prosigns', {**morse_code_dict, **PUNCTUATION, **PROSIGNS})
+register_table('cyrillic', {**CYRILLIC, **DIGITS})
+register_table('greek', {**GREEK, **DIGITS})
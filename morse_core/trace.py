@@ -0,0 +1,43 @@
+import time
+
+# How much of a PDA run is reported: nothing but start/end messages, one line
+# per decoded letter, or one line per symbol as in the step-through GUIs
+TRACE_OFF = 'off'
+TRACE_SUMMARY = 'summary'
+TRACE_FULL = 'full'
+TRACE_LEVELS = (TRACE_OFF, TRACE_SUMMARY, TRACE_FULL)
+
+# One flush per 60 Hz frame
+FRAME_INTERVAL = 1 / 60
+
+class TraceSink:
+    # Buffers trace events and hands them to `callback` as one newline-joined
+    # string, at most once per `interval` seconds. Events are kept as compact
+    # tuples and only turned into text by `format_event` when flushed; plain
+    # strings pass through unchanged. An interval of 0 flushes every event,
+    # which is how the step-through GUIs behave.
+    def __init__(self, callback, format_event=str, interval=0.0, clock=time.perf_counter):
+        self.callback = callback
+        self.format_event = format_event
+        self.interval = interval
+        self.clock = clock
+        self.events = []
+        self.next_flush = 0.0
+
+    def add(self, event):
+        self.events.append(event)
+        if not self.interval:
+            self.flush()
+
+    def due(self):
+        return not self.interval or self.clock() >= self.next_flush
+
+    def flush(self):
+        if self.interval:
+            self.next_flush = self.clock() + self.interval
+        if not self.events:
+            return
+        format_event = self.format_event
+        lines = [event if isinstance(event, str) else format_event(event) for event in self.events]
+        self.events = []
+        self.callback('\n'.join(lines))
@@ -0,0 +1,107 @@
+# Byte values of the symbols the FSA reacts to; every other byte is ignored
+DOT, DASH, LETTER_GAP, WORD_GAP = ord('.'), ord('-'), ord(' '), ord('/')
+
+class CompiledMorseTable:
+    # Dot/dash trie flattened into one integer table with a 256-wide row per state.
+    # Entries >= 0 are the next state; -1 and -2 mean "emit the letter of the
+    # current state" for ' ' and '/' respectively and jump back to the root.
+    def __init__(self, morse_to_letter):
+        children = [[-1, -1]]
+        letters = ['']
+        for code, letter in morse_to_letter.items():
+            state = 0
+            for symbol in code:
+                column = 0 if symbol == '.' else 1
+                if children[state][column] == -1:
+                    children[state][column] = len(letters)
+                    children.append([-1, -1])
+                    letters.append('')
+                state = children[state][column]
+            letters[state] = letter
+
+        # Sequences that leave the trie fall into a dead state that swallows
+        # dots and dashes and emits nothing, like an unknown code in the dict
+        dead_state = len(letters)
+        letters.append('')
+        children.append([dead_state, dead_state])
+
+        self.letters = letters
+        self.word_letters = [letter + ' ' for letter in letters]
+        self.table = table = []
+        for state, (dot_state, dash_state) in enumerate(children):
+            row = [state] * 256
+            row[DOT] = dot_state if dot_state != -1 else dead_state
+            row[DASH] = dash_state if dash_state != -1 else dead_state
+            row[LETTER_GAP] = -1
+            row[WORD_GAP] = -2
+            table.extend(row)
+
+    def run(self, morse_code, state=0):
+        # Step from `state` through the chunk, returning the letters completed by
+        # separators and the state left pending at the end of the chunk
+        if isinstance(morse_code, str):
+            # Non-ASCII characters are ignored by the FSA anyway
+            morse_code = morse_code.encode('ascii', 'ignore')
+        table = self.table
+        letters = self.letters
+        word_letters = self.word_letters
+        decoded = []
+        append = decoded.append
+        for byte in morse_code:
+            next_state = table[state << 8 | byte]
+            if next_state >= 0:
+                state = next_state
+            else:
+                append(letters[state] if next_state == -1 else word_letters[state])
+                state = 0
+        return ''.join(decoded), state
+
+    def run_counted(self, morse_code, state, metrics):
+        # Same as run(), but also counts symbols, letters and unknown codes into
+        # metrics; kept separate so that run() pays nothing for instrumentation
+        if isinstance(morse_code, str):
+            morse_code = morse_code.encode('ascii', 'ignore')
+        table = self.table
+        letters = self.letters
+        decoded = []
+        append = decoded.append
+        known = unknown = 0
+        for byte in morse_code:
+            next_state = table[state << 8 | byte]
+            if next_state >= 0:
+                state = next_state
+                continue
+            letter = letters[state]
+            if letter:
+                known += 1
+            elif state:
+                unknown += 1
+            append(letter if next_state == -1 else letter + ' ')
+            state = 0
+        metrics.symbols += len(morse_code)
+        metrics.letters += known
+        metrics.unknown_codes += unknown
+        return ''.join(decoded), state
+
+    def count_pending(self, state, metrics):
+        # Letter/unknown count for a pending state decoded at end of input
+        if state:
+            metrics.count_letter(not self.letters[state])
+
+    def decode(self, morse_code, metrics=None):
+        if metrics is None:
+            decoded, state = self.run(morse_code)
+        else:
+            decoded, state = self.run_counted(morse_code, 0, metrics)
+            self.count_pending(state, metrics)
+        return decoded + self.letters[state]
+
+# Compiled tables are shared between decoders that use the same code table
+_compiled_tables = {}
+
+def compile_morse_table(morse_to_letter):
+    key = tuple(morse_to_letter.items())
+    compiled = _compiled_tables.get(key)
+    if compiled is None:
+        compiled = _compiled_tables[key] = CompiledMorseTable(morse_to_letter)
+    return compiled
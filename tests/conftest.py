@@ -0,0 +1,5 @@
+import os
+import sys
+
+# The tests import morse_core from the checkout, without installing it
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
@@ -0,0 +1,57 @@
+import random
+
+from morse_core import CanvasPDAMorseDecoder, MorseDecoderFSA, PDAMorseDecoder, morse_code_dict
+from morse_core.trace import TRACE_OFF
+
+# Seeded inputs shared by the equivalence tests
+
+CODES = list(morse_code_dict)
+
+def reference_decode(morse_code, table=None):
+    # The original decoder: one transition() per symbol over the dict table
+    decoder = MorseDecoderFSA(table=table)
+    for symbol in morse_code:
+        decoder.transition(symbol)
+    if decoder.current_morse:
+        decoder.decode_current_morse()
+    return ''.join(decoder.decoded_message)
+
+def random_morse(rng, length):
+    # Mostly real codes and gaps, with unknown codes, long runs and stray bytes
+    parts = []
+    while sum(map(len, parts)) < length:
+        kind = rng.random()
+        if kind < 0.6:
+            parts.append(rng.choice(CODES))
+        elif kind < 0.8:
+            parts.append(rng.choice(' /'))
+        else:
+            parts.append(''.join(rng.choice('.- /x\n') for _ in range(rng.randint(1, 12))))
+    return ''.join(parts)
+
+def cases(count=200, length=60, seed=0):
+    rng = random.Random(seed)
+    return [random_morse(rng, rng.randint(0, length)) for _ in range(count)]
+
+def split(data, rng, largest=7):
+    # Cut data into random chunks of 1 to `largest` items
+    chunks = []
+    start = 0
+    while start < len(data):
+        end = start + rng.randint(1, largest)
+        chunks.append(data[start:end])
+        start = end
+    return chunks
+
+def ignore(*args):
+    # Display callback for PDAs run without a GUI
+    pass
+
+def quiet_pda(**options):
+    return PDAMorseDecoder(ignore, ignore, TRACE_OFF, **options)
+
+def quiet_canvas_pda(**options):
+    return CanvasPDAMorseDecoder(ignore, ignore, ignore, ignore, TRACE_OFF, **options)
+
+# Both PDAs, headless and untraced, for tests parametrized over the decoder
+PDAS = [quiet_pda, quiet_canvas_pda]
@@ -0,0 +1,17 @@
+import pytest
+
+from morse_core import MorseDecoderFSA, decode_batch, table_names
+from samples import cases
+
+pytest.importorskip('numpy')
+
+def test_decode_batch_matches_decode():
+    # A '\n' or non-ASCII character inside a message is ignored like any stray byte
+    messages = cases() + ['.-\n-...', 'é.- ½--/\n', '\n', '']
+    decoder = MorseDecoderFSA()
+    for table in table_names():
+        decoder.set_table(table)
+        assert decode_batch(messages, table) == [decoder.decode(message) for message in messages]
+
+def test_empty_batch():
+    assert decode_batch([]) == []
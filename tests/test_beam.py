@@ -0,0 +1,63 @@
+import random
+
+import pytest
+
+from morse_core import BeamDecoder, MorseDecoderFSA, MorseEncoder, decode_tolerant
+from morse_core.beam import FLIP_COST, GAP_COST, MIN_SWEEP_NODES, SPURIOUS_GAP_COST, WordListScorer
+
+WORDS = ['CQ', 'DE', 'TEST', 'MORSE', 'CODE', 'RADIO', 'NAME', 'HELLO']
+
+def noisy_morse(rng, words):
+    morse_code = MorseEncoder().encode(' '.join(rng.choice(WORDS) for _ in range(words)))
+    symbols = []
+    for symbol in morse_code:
+        if symbol in '.-' and rng.random() < 0.03:
+            symbol = '-' if symbol == '.' else '.'
+        elif symbol == ' ' and rng.random() < 0.05:
+            continue
+        symbols.append(symbol)
+    return ''.join(symbols)
+
+def test_clean_input_matches_fsa():
+    rng = random.Random(0)
+    morse_code = MorseEncoder().encode(' '.join(rng.choice(WORDS) for _ in range(300)))
+    assert decode_tolerant(morse_code, 1)[0] == (MorseDecoderFSA().decode(morse_code), 0.0)
+
+# One edit each, with the reading it should be repaired to
+REPAIRS = [
+    ('.... . .-.. .-.- ---', 'HELLO', FLIP_COST),            # '.-..' sent as '.-.-'
+    ('.... . .-.. .-..---', 'HELLO', GAP_COST),              # no gap between L and O
+    ('- . ... -/..-- -', 'TEST 2', SPURIOUS_GAP_COST),       # '..---' split in two
+]
+
+@pytest.mark.parametrize('morse_code, expected, cost', REPAIRS)
+def test_repairs_one_edit(morse_code, expected, cost):
+    # Without a language model other letters repair the input as cheaply, so
+    # the expected reading is only among the top ones, at the edit's cost
+    results = decode_tolerant(morse_code, 5)
+    assert (expected, cost) in results
+    assert [cost for _, cost in results] == sorted(cost for _, cost in results)
+    assert MorseDecoderFSA().decode(morse_code) != expected
+
+    # A word list picks it out
+    results = decode_tolerant(morse_code, 5, scorer=WordListScorer(WORDS + ['2']))
+    assert results[0] == (expected, cost)
+    assert [cost for _, cost in results] == sorted(cost for _, cost in results)
+    assert len(results) == 5
+
+def test_feed_is_independent_of_chunking():
+    rng = random.Random(1)
+    morse_code = noisy_morse(rng, 1500)
+    expected = decode_tolerant(morse_code, 1)[0][0]
+    decoder = BeamDecoder()
+    streamed = []
+    most_nodes = 0
+    for start in range(0, len(morse_code), 5):
+        streamed.append(decoder.feed(morse_code[start:start + 5]))
+        most_nodes = max(most_nodes, len(decoder.nodes))
+    tail = decoder.flush()[0][0]
+    assert ''.join(streamed) + tail == expected
+    # Text comes out while feeding, and the output tree stays bounded however
+    # long the input is
+    assert len(''.join(streamed)) > len(expected) // 2
+    assert most_nodes < 4 * MIN_SWEEP_NODES
@@ -0,0 +1,58 @@
+import random
+
+import pytest
+
+from morse_core import DecodeCache, MorseDecoderFSA, get_table
+from samples import cases
+
+def repeated(count=2000, distinct=50, seed=0):
+    # Traffic that keeps coming back to a few messages
+    pool = cases(distinct, seed=seed)
+    rng = random.Random(seed)
+    return [rng.choice(pool) for _ in range(count)]
+
+def test_decode_matches_uncached():
+    plain = MorseDecoderFSA()
+    cached = MorseDecoderFSA(cache=DecodeCache(max_words=64, max_messages=16))
+    for message in repeated():
+        assert cached.decode(message) == plain.decode(message)
+        data = message.encode('ascii')
+        assert cached.decode(data) == plain.decode(data)
+
+def test_decode_batch_matches_uncached():
+    pytest.importorskip('numpy')
+    messages = [message.replace('\n', '') for message in repeated()]
+    plain = MorseDecoderFSA()
+    cached = MorseDecoderFSA(cache=DecodeCache(max_messages=16))
+    for start in range(0, len(messages), 300):
+        batch = messages[start:start + 300]
+        assert cached.decode_batch(batch) == plain.decode_batch(batch)
+
+def test_eviction_keeps_limits():
+    cache = DecodeCache(max_words=8, max_messages=4)
+    decoder = MorseDecoderFSA(cache=cache)
+    for message in cases(300, seed=1):
+        decoder.decode(message)
+        assert len(cache.words) <= 8
+        assert len(cache.messages) <= 4
+    assert cache.evictions > 0
+
+def test_stats():
+    cache = DecodeCache()
+    decoder = MorseDecoderFSA(cache=cache)
+    decoder.decode('.- -/-.-.')
+    decoder.decode('.- -/.')
+    decoder.decode('.- -/-.-.')
+    assert cache.stats() == {
+        'word_hits': 1, 'word_misses': 3, 'message_hits': 1, 'message_misses': 2,
+        'evictions': 0, 'words': 3, 'messages': 2, 'hit_rate': 2 / 7,
+    }
+
+def test_bind_clears_on_table_change():
+    cache = DecodeCache()
+    decoder = MorseDecoderFSA(cache=cache)
+    assert decoder.decode('.-') == 'A'
+    decoder.set_table('greek')
+    assert decoder.decode('.-') == get_table('greek').morse_to_letter['.-']
+    assert list(cache.messages) == ['.-']
+    assert cache.code_table is get_table('greek')
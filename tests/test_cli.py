@@ -0,0 +1,90 @@
+import csv
+import json
+
+import pytest
+
+from morse_core import MorseDecoderFSA
+from morse_core.cli import main
+from samples import cases, quiet_pda
+
+@pytest.fixture
+def inputs(tmp_path):
+    # Two transcripts of one message per line; '\n' only ends lines here
+    paths = []
+    for seed in range(2):
+        path = tmp_path / f'calls{seed}.txt'
+        path.write_text('\n'.join(message.replace('\n', '') for message in cases(100, seed=seed)) + '\n')
+        paths.append(path)
+    return paths
+
+def run(tmp_path, *args):
+    output = tmp_path / 'out'
+    main([*map(str, args), '-o', str(output)])
+    return output.read_text(encoding='utf-8')
+
+def lines(paths):
+    return [line for path in paths for line in path.read_text().splitlines()]
+
+def pda_decode(message):
+    decoder = quiet_pda()
+    decoder.set_input(message)
+    decoder.run_to_end(None)
+    return decoder.decoded_message
+
+@pytest.mark.parametrize('jobs', ['1', '2'])
+def test_line_mode(tmp_path, inputs, jobs):
+    decoder = MorseDecoderFSA()
+    expected = ''.join(decoder.decode(line) + '\n' for line in lines(inputs))
+    assert run(tmp_path, *inputs, '-j', jobs) == expected
+    assert run(tmp_path, *inputs, '-j', jobs, '--cache') == expected
+
+@pytest.mark.parametrize('jobs', ['1', '2'])
+def test_file_mode(tmp_path, inputs, jobs):
+    decoder = MorseDecoderFSA()
+    expected = ''.join(decoder.decode(path.read_text()) + '\n' for path in inputs)
+    assert run(tmp_path, *inputs, '--mode', 'file', '-j', jobs) == expected
+
+def test_one_file_in_shards(tmp_path, inputs):
+    expected = MorseDecoderFSA().decode(inputs[0].read_text()) + '\n'
+    assert run(tmp_path, inputs[0], '--mode', 'file', '-j', '2') == expected
+
+@pytest.mark.parametrize('jobs', ['1', '2'])
+def test_pda_engine(tmp_path, inputs, jobs):
+    expected = ''.join(pda_decode(line) + '\n' for line in lines(inputs))
+    assert run(tmp_path, *inputs, '--engine', 'pda', '-j', jobs) == expected
+
+@pytest.mark.parametrize('engine', ['fsa', 'pda'])
+def test_jsonl_records(tmp_path, inputs, engine):
+    records = [json.loads(line) for line in run(tmp_path, *inputs, '--format', 'jsonl', '--engine', engine, '-j', '2').splitlines()]
+    expected = [(str(path), number, line) for path in inputs for number, line in enumerate(path.read_text().splitlines(), 1)]
+    assert [(record['source'], record['line']) for record in records] == [item[:2] for item in expected]
+    decoder = MorseDecoderFSA()
+    for record, (_, _, line) in zip(records, expected):
+        assert record['decoded'] == (decoder.decode(line) if engine == 'fsa' else pda_decode(line))
+        assert record['symbols'] == len(line)
+
+def test_csv_records(tmp_path, inputs):
+    rows = list(csv.DictReader(run(tmp_path, *inputs, '--format', 'csv').splitlines()))
+    decoder = MorseDecoderFSA()
+    assert [row['decoded'] for row in rows] == [decoder.decode(line) for line in lines(inputs)]
+    assert [row['source'] for row in rows] == [str(path) for path in inputs for _ in range(100)]
+
+@pytest.mark.parametrize('args', [['--engine', 'pda'], ['--format', 'jsonl']])
+def test_cache_rejected(tmp_path, inputs, args):
+    with pytest.raises(SystemExit):
+        run(tmp_path, inputs[0], '--cache', *args)
+
+def test_directory_input(tmp_path, inputs):
+    # A directory stands for the files directly inside it, in sorted order
+    directory = tmp_path / 'calls'
+    (directory / 'nested').mkdir(parents=True)
+    moved = [path.rename(directory / path.name) for path in inputs]
+    decoder = MorseDecoderFSA()
+    assert run(tmp_path, directory) == ''.join(decoder.decode(line) + '\n' for line in lines(moved))
+
+@pytest.mark.parametrize('name', ['empty', 'missing.txt', '*.none'])
+def test_no_input_files(tmp_path, capsys, name):
+    (tmp_path / 'empty').mkdir()
+    with pytest.raises(SystemExit):
+        run(tmp_path, tmp_path / name)
+    assert 'no input files match' in capsys.readouterr().err
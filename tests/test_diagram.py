@@ -0,0 +1,78 @@
+import io
+
+import pytest
+
+from morse_core import diagram, get_table
+from morse_core.diagram import DiagramLayout, ImageCache, highlighted_path
+
+Image = pytest.importorskip('PIL.Image')
+
+# Hand-written `plain` output in the shape `neato -n2` gives for the FSA
+# graph: a 3 x 1 inch layout with quoted names and labels, including the
+# apostrophe and double quote letters of itu-extended
+PLAIN = b'''graph 1 3 1
+node START 0.3 0.5 0.5 0.5 START filled circle black lightblue
+node "." 1.3 0.5 0.5 0.5 ". (.)" solid ellipse black lightgrey
+node "._decoded" 2.5 0.5 0.5 0.5 E filled doublecircle black yellow
+node ".----._decoded" 2.8 0.85 0.2 0.2 "'" filled doublecircle black yellow
+node ".-..-._decoded" 2.8 0.15 0.2 0.2 "\\"" filled doublecircle black yellow
+edge START "." 4 0.55 0.5 0.8 0.5 0.9 0.5 1.05 0.5 "." 0.8 0.6 solid black
+edge "." "._decoded" 4 1.55 0.5 1.8 0.5 2 0.5 2.25 0.5 "Decode: E" 1.9 0.6 solid black
+edge ".----." ".----._decoded" 4 2.5 0.85 2.55 0.85 2.6 0.85 2.7 0.85 "Decode: '" 2.6 0.95 solid black
+edge ".-..-." ".-..-._decoded" 4 2.5 0.15 2.55 0.15 2.6 0.15 2.7 0.15 "Decode: \\"" 2.6 0.25 solid black
+stop
+'''
+
+def layout(scale=100):
+    # A white base image at `scale` pixels per inch, padding included
+    size = (round(3.2 * scale), round(1.2 * scale))
+    png = io.BytesIO()
+    Image.new('RGB', size, 'white').save(png, 'PNG')
+    return DiagramLayout(png.getvalue(), PLAIN)
+
+def test_highlighted_path():
+    table = get_table('itu').morse_to_letter
+    assert highlighted_path(table, '.-') == (['START', '.', '.-'], True)
+    # A prefix of '..---' that is no letter itself
+    assert highlighted_path(table, '..--') == (['START', '.', '..', '..-', '..--'], False)
+    # A second letter has no edge from the first one's state
+    assert highlighted_path(table, '.- -...') == (['START', '.', '.-'], False)
+    assert highlighted_path(table, '') == (['START'], False)
+
+def test_plain_layout():
+    parsed = layout()
+    assert (parsed.width, parsed.height, parsed.scale) == (3, 1, 100)
+    assert parsed.nodes['.'] == (1.3, 0.5, 0.5, 0.5)
+    assert parsed.nodes['.----._decoded'] == (2.8, 0.85, 0.2, 0.2)
+    assert parsed.nodes['.-..-._decoded'] == (2.8, 0.15, 0.2, 0.2)
+    assert parsed.edges[('START', '.')] == [(0.55, 0.5), (0.8, 0.5), (0.9, 0.5), (1.05, 0.5)]
+    assert parsed.edges[('.-..-.', '.-..-._decoded')][-1] == (2.7, 0.15)
+    # Inches from the bottom left, pixels from the top left past the padding
+    assert parsed.to_pixels(0, 1) == (10, 10)
+
+def test_render_highlight(monkeypatch):
+    parsed = layout()
+    monkeypatch.setattr(diagram, 'get_layout', lambda table_items: parsed)
+    table_items = tuple(get_table('itu').morse_to_letter.items())
+    image = diagram.render_diagram(table_items, '.')
+    # START -> '.' is drawn, '._decoded' is ringed, the base image is untouched
+    assert image.getpixel(tuple(map(round, parsed.to_pixels(0.8, 0.5)))) == diagram.HIGHLIGHT_COLOR
+    assert image.getpixel(tuple(map(round, parsed.to_pixels(2.5, 0.75)))) == diagram.FINAL_STATE_COLOR
+    assert image.getpixel(tuple(map(round, parsed.to_pixels(1.8, 0.5)))) == (255, 255, 255)
+    assert parsed.image.getpixel(tuple(map(round, parsed.to_pixels(0.8, 0.5)))) == (255, 255, 255)
+
+def test_image_cache_budget():
+    # 10 x 10 RGB images take 300 bytes each, so three fit
+    cache = ImageCache(max_bytes=1000)
+    images = {key: Image.new('RGB', (10, 10)) for key in 'abcd'}
+    for key in 'abc':
+        cache.put(key, images[key])
+    assert cache.get('a') is images['a']
+    cache.put('d', images['d'])
+    assert list(cache.images) == ['c', 'a', 'd']
+    assert cache.get('b') is None
+    assert cache.size == 900
+
+    cache.put('big', Image.new('RGB', (20, 20)))
+    assert cache.get('big') is None
+    assert cache.size <= cache.max_bytes
@@ -0,0 +1,51 @@
+import io
+import random
+
+import pytest
+
+from morse_core import MorseDecoderFSA, MorseEncoder, get_table
+from morse_core.tables import PROSIGNS
+
+@pytest.mark.parametrize('table', ['itu', 'itu-extended', 'cyrillic', 'greek'])
+def test_round_trip(table):
+    rng = random.Random(0)
+    letters = [letter for letter in get_table(table).letter_to_morse if len(letter) == 1]
+    encoder = MorseEncoder(table)
+    decoder = MorseDecoderFSA(table=table)
+    for _ in range(300):
+        text = ''.join(rng.choice(letters + [' ']) for _ in range(rng.randint(0, 40)))
+        assert decoder.decode(encoder.encode(text)) == text
+        assert decoder.decode(encoder.encode(text.lower())) == text
+
+def test_line_breaks_are_one_word_gap():
+    encoder = MorseEncoder()
+    decoder = MorseDecoderFSA()
+    for text in ('HI\nYOU', 'HI\r\nYOU', 'HI\rYOU', 'HI\tYOU'):
+        assert decoder.decode(encoder.encode(text)) == 'HI YOU'
+
+def test_iter_encode_matches_encode():
+    encoder = MorseEncoder()
+    text = 'CQ CQ\r\nDE K1ABC\r\r\nK\n'
+    for chunk_size in range(1, len(text) + 1):
+        stream = io.StringIO(text, newline='')
+        assert ''.join(encoder.iter_encode(stream, chunk_size)) == encoder.encode(text)
+
+def test_unknown_characters():
+    encoder = MorseEncoder()
+    assert encoder.encode('A~B') == '.- -... '
+    # The miss is kept, so the next '~' is dropped without a Python call
+    assert encoder.translation[ord('~')] is None
+    assert encoder.encode('~A~') == '.- '
+    strict = MorseEncoder(errors='strict')
+    for _ in range(2):
+        with pytest.raises(ValueError):
+            strict.encode('A~B')
+
+def test_prosigns_replace_shared_punctuation():
+    # AR, BT and AS take over the codes of '+', '=' and '&'
+    prosigns = get_table('itu-prosigns')
+    extended = get_table('itu-extended')
+    shared = {code: extended.morse_to_letter[code] for code in PROSIGNS if code in extended.morse_to_letter}
+    assert sorted(shared.values()) == ['&', '+', '=']
+    assert {code: prosigns.morse_to_letter[code] for code in shared} == {'.-.-.': '<AR>', '-...-': '<BT>', '.-...': '<AS>'}
+    assert not {'&', '+', '='} & set(prosigns.letter_to_morse)
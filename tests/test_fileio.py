@@ -0,0 +1,86 @@
+import random
+
+import pytest
+
+from morse_core import MorseDecoderFSA, decode_file
+from samples import random_morse
+
+@pytest.fixture
+def transcript(tmp_path):
+    path = tmp_path / 'transcript.txt'
+    path.write_bytes(random_morse(random.Random(0), 20000).encode('ascii'))
+    return path
+
+@pytest.mark.parametrize('table', ['itu', 'greek'])
+@pytest.mark.parametrize('block_size', [1, 7, 4096, 1 << 22])
+def test_decode_file_matches_decode(tmp_path, transcript, table, block_size):
+    data = transcript.read_bytes()
+    output = tmp_path / 'decoded.txt'
+    expected = MorseDecoderFSA(table=table).decode(data)
+    assert decode_file(transcript, output, table, block_size) == len(expected)
+    assert output.read_text(encoding='utf-8') == expected
+
+def test_empty_file(tmp_path):
+    path = tmp_path / 'empty.txt'
+    path.write_bytes(b'')
+    output = tmp_path / 'decoded.txt'
+    output.write_text('stale')
+    assert decode_file(path, output) == 0
+    assert output.read_bytes() == b''
+
+class Interrupted(Exception):
+    pass
+
+@pytest.mark.parametrize('blocks', [1, 5, 17, 60])
+def test_resume_after_interruption(tmp_path, transcript, monkeypatch, blocks):
+    output = tmp_path / 'decoded.txt'
+    checkpoint = tmp_path / 'decoded.ckpt'
+    feed = MorseDecoderFSA.feed
+    fed = []
+
+    def interrupting_feed(decoder, chunk):
+        if len(fed) == blocks:
+            raise Interrupted
+        fed.append(chunk)
+        return feed(decoder, chunk)
+
+    monkeypatch.setattr(MorseDecoderFSA, 'feed', interrupting_feed)
+    with pytest.raises(Interrupted):
+        decode_file(transcript, output, 'greek', 256, checkpoint, checkpoint_every=1000)
+    monkeypatch.undo()
+    assert checkpoint.exists() == (blocks * 256 >= 1000)
+
+    expected = MorseDecoderFSA(table='greek').decode(transcript.read_bytes())
+    assert decode_file(transcript, output, 'greek', 256, checkpoint, checkpoint_every=1000) == len(expected)
+    assert output.read_text(encoding='utf-8') == expected
+    assert not checkpoint.exists()
+
+def test_checkpoint_for_other_input(tmp_path, transcript, monkeypatch):
+    output = tmp_path / 'decoded.txt'
+    checkpoint = tmp_path / 'decoded.ckpt'
+    feed = MorseDecoderFSA.feed
+    fed = []
+
+    def interrupting_feed(decoder, chunk):
+        if len(fed) == 8:
+            raise Interrupted
+        fed.append(chunk)
+        return feed(decoder, chunk)
+
+    monkeypatch.setattr(MorseDecoderFSA, 'feed', interrupting_feed)
+    with pytest.raises(Interrupted):
+        decode_file(transcript, output, None, 256, checkpoint, checkpoint_every=1000)
+    monkeypatch.undo()
+
+    # The same file changed since, and another file of the same size
+    other = tmp_path / 'other.txt'
+    other.write_bytes(transcript.read_bytes()[::-1])
+    transcript.write_bytes(transcript.read_bytes() + b'.')
+    for path in (transcript, other):
+        with pytest.raises(ValueError):
+            decode_file(path, output, None, 256, checkpoint, checkpoint_every=1000)
+
+    # A checkpoint too short to hold its progress record
+    checkpoint.write_bytes(b'MSNP')
+    with pytest.raises(ValueError):
+        decode_file(other, output, None, 256, checkpoint)
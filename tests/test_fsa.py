@@ -0,0 +1,31 @@
+import io
+import random
+
+import pytest
+
+from morse_core import MorseDecoderFSA, iter_decode, table_names
+from samples import cases, quiet_pda, reference_decode, split
+
+@pytest.mark.parametrize('table', table_names())
+def test_decode_matches_reference(table):
+    decoder = MorseDecoderFSA(table=table)
+    for morse_code in cases():
+        assert decoder.decode(morse_code) == reference_decode(morse_code, table)
+        assert decoder.decode(morse_code.encode('ascii')) == reference_decode(morse_code, table)
+
+def test_feed_flush_matches_decode():
+    rng = random.Random(1)
+    decoder = MorseDecoderFSA()
+    for morse_code in cases():
+        for data in (morse_code, morse_code.encode('ascii')):
+            decoded = ''.join(decoder.feed(chunk) for chunk in split(data, rng)) + decoder.flush()
+            assert decoded == decoder.decode(morse_code)
+
+@pytest.mark.parametrize('stream', [io.StringIO, lambda text: io.BytesIO(text.encode('ascii'))])
+def test_iter_decode_text_and_binary(stream):
+    for morse_code in cases(50):
+        expected = MorseDecoderFSA().decode(morse_code)
+        assert ''.join(iter_decode(stream(morse_code), chunk_size=5)) == expected
+        pda = quiet_pda()
+        pda_expected = pda.feed(morse_code) + pda.flush()
+        assert ''.join(iter_decode(stream(morse_code), quiet_pda(), 5)) == pda_expected
@@ -0,0 +1,60 @@
+import pytest
+
+from morse_core import MorseDecoderFSA, MorseEncoder
+from morse_core.keying import AudioKeyingFrontEnd, KeyingClassifier, decode_wav, keying_from_morse, synthesize_audio, write_wav
+
+pytest.importorskip('numpy')
+
+TEXT = 'CQ CQ DE K1ABC THE QUICK BROWN FOX JUMPS OVER THE LAZY DOG'
+
+def stream(samples, sample_rate, block_seconds):
+    front_end = AudioKeyingFrontEnd(sample_rate)
+    block = max(1, int(sample_rate * block_seconds))
+    symbols = [front_end.feed(samples[start:start + block]) for start in range(0, len(samples), block)]
+    symbols.append(front_end.flush())
+    return MorseDecoderFSA().decode(''.join(symbols)).strip()
+
+@pytest.mark.parametrize('sample_rate', [8000, 22050, 48000])
+@pytest.mark.parametrize('wpm', [10, 20, 35, 45])
+def test_audio_in_small_blocks(sample_rate, wpm):
+    # The front-end starts out guessing 20 WPM
+    samples = synthesize_audio(MorseEncoder().encode(TEXT), sample_rate, wpm)
+    for block_seconds in (0.01, 0.05, 0.5):
+        assert stream(samples, sample_rate, block_seconds) == TEXT
+
+@pytest.mark.parametrize('sample_rate, block_seconds', [(8000, 0.01), (48000, 0.005), (48000, 0.01), (8000, 0.37), (22050, 0.023)])
+@pytest.mark.parametrize('noise', [0.05, 0.2])
+def test_noisy_audio_in_any_blocks(sample_rate, block_seconds, noise):
+    # Noise is not keyed as marks, and odd block sizes decode like any other
+    for text, wpm in (('HELLO', 20), ('THE QUICK', 20), ('0000 9', 12), ('TEST 1234567890', 12)):
+        samples = synthesize_audio(MorseEncoder().encode(text), sample_rate, wpm, noise=noise)
+        assert stream(samples, sample_rate, block_seconds) == text
+
+def test_classifier_follows_speed():
+    decoder = MorseDecoderFSA()
+    for wpm in (10, 25, 45):
+        key_down, durations = keying_from_morse(MorseEncoder().encode(TEXT), wpm)
+        classifier = KeyingClassifier()
+        symbols = ''.join(classifier.feed(key_down[start:start + 8], durations[start:start + 8])
+                          for start in range(0, len(key_down), 8))
+        assert decoder.decode(symbols).strip() == TEXT
+        assert classifier.wpm == pytest.approx(wpm, rel=0.05)
+
+@pytest.mark.parametrize('text', ['TMO', 'SHE IS HIS', 'EEE'])
+@pytest.mark.parametrize('wpm', [12, 30, 40])
+def test_one_mark_length(text, wpm):
+    # Only dots or only dashes: the gaps between them set the speed
+    samples = synthesize_audio(MorseEncoder().encode(text), 8000, wpm)
+    assert stream(samples, 8000, 0.05) == text
+
+    key_down, durations = keying_from_morse(MorseEncoder().encode(text), wpm)
+    classifier = KeyingClassifier()
+    symbols = ''.join(classifier.feed(key_down[start:start + 8], durations[start:start + 8])
+                      for start in range(0, len(key_down), 8))
+    assert MorseDecoderFSA().decode(symbols).strip() == text
+    assert classifier.wpm == pytest.approx(wpm, rel=0.05)
+
+def test_decode_wav(tmp_path):
+    path = tmp_path / 'cq.wav'
+    write_wav(path, synthesize_audio(MorseEncoder().encode(TEXT), 16000, 30, noise=0.1), 16000)
+    assert decode_wav(path).strip() == TEXT
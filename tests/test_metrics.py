@@ -0,0 +1,73 @@
+import os
+import random
+import subprocess
+import sys
+
+import pytest
+
+from morse_core import DecoderMetrics, MorseDecoderFSA
+from morse_core.metrics import phase
+from samples import cases, quiet_canvas_pda, quiet_pda, split
+
+def counts(metrics):
+    return metrics.symbols, metrics.letters, metrics.unknown_codes
+
+def test_counts_match_across_decoders():
+    rng = random.Random(0)
+    for morse_code in cases(100):
+        metrics = DecoderMetrics()
+        MorseDecoderFSA(metrics).decode(morse_code)
+        expected = counts(metrics)
+
+        metrics = DecoderMetrics()
+        decoder = MorseDecoderFSA(metrics)
+        for chunk in split(morse_code, rng):
+            decoder.feed(chunk)
+        decoder.flush()
+        assert counts(metrics) == expected
+
+        metrics = DecoderMetrics()
+        decoder = quiet_pda(metrics=metrics)
+        decoder.set_input(morse_code)
+        decoder.decode_all()
+        assert counts(metrics) == expected
+        depth = metrics.max_stack_depth
+
+        # The canvas decoder closes the last letter on its end step
+        metrics = DecoderMetrics()
+        decoder = quiet_canvas_pda(metrics=metrics)
+        decoder.set_input(morse_code)
+        decoder.decode_all()
+        decoder.step_decode()
+        assert counts(metrics) == (len(morse_code.strip()), *expected[1:])
+        assert metrics.max_stack_depth == depth
+
+def test_phase():
+    assert phase(None, 'decode') is phase(None, 'feed')
+    metrics = DecoderMetrics()
+    for _ in range(3):
+        with phase(metrics, 'decode'):
+            pass
+    with phase(metrics, 'feed'):
+        pass
+    assert metrics.phase_calls == {'decode': 3, 'feed': 1}
+    assert set(metrics.phase_seconds) == {'decode', 'feed'}
+    assert all(seconds >= 0 for seconds in metrics.phase_seconds.values())
+    metrics.reset()
+    assert metrics.phase_calls == {} and metrics.symbols == 0
+
+def test_profile_and_memory():
+    metrics = DecoderMetrics(profile=True, trace_memory=True)
+    with phase(metrics, 'decode'):
+        decoded = [MorseDecoderFSA().decode('.- ' * 1000) for _ in range(3)]
+    assert decoded[0] == 'A' * 1000
+    assert metrics.peak_memory > 0
+    assert 'decode' in metrics.profile_report()
+    assert DecoderMetrics().profile_report() == ''
+
+@pytest.mark.parametrize('module', ['cProfile', 'pstats', 'tracemalloc'])
+def test_tools_imported_on_demand(module):
+    # Only checkable in a fresh interpreter
+    root = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+    code = f"import sys, morse_core; morse_core.DecoderMetrics().reset(); sys.exit({module!r} in sys.modules)"
+    assert subprocess.run([sys.executable, '-c', code], cwd=root).returncode == 0
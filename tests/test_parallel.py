@@ -0,0 +1,33 @@
+import random
+
+from morse_core import MorseDecoderFSA
+from morse_core.parallel import decode_parallel, decode_paths_parallel, split_shards
+from samples import cases, random_morse
+
+def test_split_shards_preserves_output():
+    decoder = MorseDecoderFSA()
+    rng = random.Random(0)
+    inputs = cases(50, length=400) + ['.-' * 300, '.-\n-..' * 50, '']
+    for morse_code in inputs:
+        for data in (morse_code, morse_code.encode('ascii')):
+            for shard_size in (1, 2, 3, rng.randint(4, 64)):
+                shards = split_shards(data, shard_size)
+                assert data[:0].join(shards) == data
+                assert ''.join(map(decoder.decode, shards)) == decoder.decode(data)
+
+def test_decode_parallel_matches_decode():
+    morse_code = random_morse(random.Random(1), 5000)
+    decoder = MorseDecoderFSA()
+    for data in (morse_code, morse_code.encode('ascii'), '-.' * 2000):
+        for shard_size in (1, 17, 1000):
+            assert decode_parallel(data, 2, shard_size) == decoder.decode(data)
+    assert decode_parallel(morse_code, 2, 64, 'greek') == MorseDecoderFSA(table='greek').decode(morse_code)
+
+def test_decode_paths_parallel(tmp_path):
+    paths = []
+    for number, morse_code in enumerate(cases(40, seed=2)):
+        path = tmp_path / f'{number}.txt'
+        path.write_text(morse_code)
+        paths.append(path)
+    decoder = MorseDecoderFSA()
+    assert decode_paths_parallel(paths, 2) == [decoder.decode(path.read_bytes()) for path in paths]
@@ -0,0 +1,38 @@
+import random
+
+import pytest
+
+from morse_core.replay import ExecutionTrace
+from samples import PDAS, quiet_pda
+
+@pytest.mark.parametrize('make', PDAS)
+def test_seek_matches_stepping(make):
+    rng = random.Random(0)
+    morse_code = ''.join(rng.choice('.-  /x') for _ in range(1500))
+    reference = make()
+    reference.set_input(morse_code)
+    states = [reference.snapshot()]
+    for _ in range(len(morse_code) + 1):
+        reference.step_decode()
+        states.append(reference.snapshot())
+
+    decoder = make()
+    decoder.set_input(morse_code)
+    execution = ExecutionTrace(decoder, checkpoint_interval=64)
+    steps = list(range(execution.final_step + 1))
+    rng.shuffle(steps)
+    for step in steps[:400] + [0, execution.final_step]:
+        assert execution.seek(decoder, step) == step
+        assert decoder.snapshot() == states[step]
+
+def test_decode_all_ends_on_final_step():
+    # The end step closes the last letter just like Decode All
+    decoder = quiet_pda()
+    decoder.set_input('.- -')
+    decoder.decode_all()
+    assert (decoder.decoded_message, decoder.stack) == ('AT', [])
+    finished = decoder.snapshot()
+
+    execution = ExecutionTrace(decoder)
+    assert execution.seek(decoder, execution.final_step) == execution.final_step
+    assert decoder.snapshot() == finished
@@ -0,0 +1,85 @@
+import asyncio
+
+from morse_core.server import MorseSessionProtocol, ServerStats, start_server
+
+def serve(client):
+    # Run client(port) against a server on a free port and return its stats
+    # once every connection has been closed
+    async def main():
+        server, stats = await start_server(port=0)
+        port = server.sockets[0].getsockname()[1]
+        async with server:
+            await client(port)
+            for _ in range(100):
+                if not stats.active:
+                    break
+                await asyncio.sleep(0.01)
+        return stats
+
+    return asyncio.run(main())
+
+async def exchange(port, *writes):
+    # Send each write on its own, then shut down the sending side and read
+    # everything the server sends back until it closes the connection
+    reader, writer = await asyncio.open_connection('127.0.0.1', port)
+    for data in writes:
+        writer.write(data)
+        await writer.drain()
+        await asyncio.sleep(0.02)
+    writer.write_eof()
+    reply = await reader.read()
+    writer.close()
+    await writer.wait_closed()
+    return reply
+
+def test_letter_split_across_writes():
+    # '.' then '-' is one 'A', not an 'E' and a 'T'
+    replies = []
+
+    async def client(port):
+        replies.append(await exchange(port, b'.', b'- -', b'... /'))
+
+    serve(client)
+    assert replies == [b'AB ']
+
+def test_pending_letter_on_eof():
+    replies = []
+
+    async def client(port):
+        replies.append(await exchange(port, b'... --- ...'))
+        replies.append(await exchange(port, b'/.-'))
+
+    stats = serve(client)
+    assert replies == [b'SOS', b' A']
+    assert (stats.sessions, stats.active, stats.peak_active) == (2, 0, 1)
+    assert stats.bytes_in == len(b'... --- .../.-')
+    assert stats.bytes_out == len(b'SOS A')
+
+def test_concurrent_sessions():
+    async def client(port):
+        replies = await asyncio.gather(*(exchange(port, b'.- ', b'-...') for _ in range(20)))
+        assert replies == [b'AB'] * 20
+
+    stats = serve(client)
+    assert stats.sessions == 20
+    assert stats.active == 0
+
+class RecordingTransport:
+    def __init__(self):
+        self.calls = []
+
+    def pause_reading(self):
+        self.calls.append('pause')
+
+    def resume_reading(self):
+        self.calls.append('resume')
+
+def test_backpressure_pauses_reading():
+    stats = ServerStats()
+    protocol = MorseSessionProtocol(None, stats)
+    transport = RecordingTransport()
+    protocol.connection_made(transport)
+    protocol.pause_writing()
+    protocol.resume_writing()
+    assert transport.calls == ['pause', 'resume']
+    assert stats.paused == 1
@@ -0,0 +1,25 @@
+import random
+
+from morse_core import MorseDecoderFSA
+from morse_core.session import MorseSession, pack_code, unpack_code
+from samples import CODES, cases, split
+
+def test_session_matches_decode():
+    rng = random.Random(2)
+    for morse_code in cases():
+        session = MorseSession()
+        for chunk in split(morse_code, rng):
+            session.feed(chunk)
+        assert session.flush().decode('utf-8') == MorseDecoderFSA().decode(morse_code)
+
+def test_take_empties_output():
+    session = MorseSession()
+    session.feed('.... .. ')
+    assert session.take() == b'HI'
+    assert session.take() == b''
+    session.feed('-')
+    assert session.current_morse == '-'
+
+def test_packed_codes_round_trip():
+    for code in CODES:
+        assert unpack_code(pack_code(code)) == code
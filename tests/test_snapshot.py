@@ -0,0 +1,75 @@
+import pytest
+
+from morse_core import MorseDecoderFSA
+from morse_core.session import MorseSession
+from samples import PDAS, cases
+
+def test_fsa_snapshot_resumes_stream():
+    data = ''.join(cases())
+    expected = MorseDecoderFSA().decode(data)
+    for cut in range(0, len(data), 97):
+        first = MorseDecoderFSA()
+        decoded = first.feed(data[:cut])
+        second = MorseDecoderFSA()
+        second.restore(first.snapshot())
+        assert decoded + second.feed(data[second.stream_offset:]) + second.flush() == expected
+
+def test_fsa_snapshot_leaves_out_decode_output():
+    decoder = MorseDecoderFSA()
+    empty = len(decoder.snapshot())
+    decoder.decode('.- ' * 10000)
+    assert len(decoder.snapshot()) == empty
+
+def test_fsa_snapshot_keeps_step_by_step_state():
+    decoder = MorseDecoderFSA()
+    for symbol in '.- -.':
+        decoder.transition(symbol)
+    restored = MorseDecoderFSA()
+    restored.restore(decoder.snapshot())
+    assert (restored.state, restored.current_morse, restored.decoded_message) == ('DOT', '-.', ['A'])
+
+def test_session_snapshot_resumes():
+    session = MorseSession('itu-prosigns')
+    session.feed('.... ...---.')
+    restored = MorseSession('itu-prosigns')
+    restored.restore(session.snapshot())
+    restored.feed('.. ')
+    assert restored.take() == b'H<SOS>'
+
+@pytest.mark.parametrize('make', PDAS)
+def test_pda_snapshot_resumes(make):
+    morse_code = '.... .. /-.-- --- ..- .-.-.'
+    for cut in range(len(morse_code) + 1):
+        reference = make()
+        reference.set_input(morse_code)
+        for _ in range(cut):
+            reference.step_decode()
+        restored = make()
+        restored.set_input(morse_code)
+        restored.restore(reference.snapshot())
+        assert restored.snapshot() == reference.snapshot()
+        restored.decode_all()
+        reference.decode_all()
+        assert restored.decoded_message == reference.decoded_message
+    other = make()
+    other.set_input('.-')
+    with pytest.raises(ValueError):
+        other.restore(reference.snapshot())
+    other = make(table='greek')
+    other.set_input(morse_code)
+    with pytest.raises(ValueError):
+        other.restore(reference.snapshot())
+
+def test_snapshots_reject_other_tables_and_damage():
+    session = MorseSession('itu-prosigns')
+    session.feed('...---.')
+    with pytest.raises(ValueError):
+        MorseSession('itu').restore(session.snapshot())
+    with pytest.raises(ValueError):
+        MorseDecoderFSA(table='itu').restore(MorseDecoderFSA(table='greek').snapshot())
+    snapshot = MorseDecoderFSA().snapshot()
+    for length in range(len(snapshot)):
+        with pytest.raises(ValueError):
+            MorseDecoderFSA().restore(snapshot[:length])
+    with pytest.raises(ValueError):
+        MorseDecoderFSA().restore(MorseSession().snapshot())
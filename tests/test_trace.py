@@ -0,0 +1,99 @@
+import pytest
+
+from morse_core import CanvasPDAMorseDecoder, PDAMorseDecoder
+from morse_core.trace import TRACE_FULL, TRACE_OFF, TRACE_SUMMARY, TraceSink
+from samples import ignore
+
+MORSE = '.... . .-.. .-.. ---/.-- --- .-. .-.. -..'
+
+class Clock:
+    def __init__(self):
+        self.now = 0.0
+
+    def __call__(self):
+        return self.now
+
+def make_pda(display, level, interval=0.0):
+    return PDAMorseDecoder(display, ignore, level, interval)
+
+def make_canvas_pda(display, level, interval=0.0):
+    return CanvasPDAMorseDecoder(display, ignore, ignore, ignore, level, interval)
+
+def test_sink_joins_buffered_events():
+    flushed = []
+    clock = Clock()
+    sink = TraceSink(flushed.append, lambda event: '+'.join(event), interval=0.1, clock=clock)
+    sink.add('start')
+    sink.add(('a', 'b'))
+    sink.add(('c', 'd'))
+    assert flushed == []
+    sink.flush()
+    assert flushed == ['start\na+b\nc+d']
+    # An empty buffer flushes nothing
+    sink.flush()
+    assert flushed == ['start\na+b\nc+d']
+
+def test_sink_due_after_interval():
+    flushed = []
+    clock = Clock()
+    sink = TraceSink(flushed.append, interval=0.1, clock=clock)
+    assert sink.due()
+    sink.flush()
+    clock.now = 0.05
+    assert not sink.due()
+    clock.now = 0.1
+    assert sink.due()
+
+def test_sink_without_interval_flushes_each_event():
+    flushed = []
+    sink = TraceSink(flushed.append)
+    sink.add('one')
+    sink.add('two')
+    assert sink.due()
+    assert flushed == ['one', 'two']
+
+@pytest.mark.parametrize('make', [make_pda, make_canvas_pda])
+def test_one_flush_per_interval(make):
+    # With the clock standing still, a whole run reaches the display in the
+    # flushes that set_input and the end of the run force, and nowhere else
+    flushed = []
+    decoder = make(flushed.append, TRACE_FULL, 1 / 60)
+    clock = decoder.trace.clock = Clock()
+    decoder.set_input(MORSE)
+    decoder.decode_all()
+    assert len(flushed) == 2
+    assert flushed[1].count('\n') > len(MORSE)
+
+    # Once the interval has passed, the next step flushes again
+    flushed.clear()
+    decoder.set_input(MORSE)
+    decoder.step_decode()
+    clock.now = 1
+    decoder.step_decode()
+    decoder.step_decode()
+    assert len(flushed) == 2
+
+def trace_lines(make, level):
+    # Event lines of a whole run; the end step closes the last letter, which
+    # the canvas PDA's Decode All leaves on the stack
+    flushed = []
+    decoder = make(flushed.append, level)
+    decoder.set_input(MORSE)
+    decoder.decode_all()
+    decoder.step_decode()
+    assert decoder.decoded_message.strip() == 'HELLO WORLD'
+    lines = [line for text in flushed for line in text.split('\n')]
+    assert lines[0].startswith('Ready to decode.')
+    assert lines[-1] == 'End of sequence reached.'
+    return [line for line in lines if line.startswith(('Action:', 'Decoded:'))]
+
+@pytest.mark.parametrize('make, decoded', [(make_pda, 'Action: Decode |'), (make_canvas_pda, 'Decoded:')])
+def test_trace_levels(make, decoded):
+    full = trace_lines(make, TRACE_FULL)
+    summary = trace_lines(make, TRACE_SUMMARY)
+    assert len(full) > len(MORSE)
+    assert len(summary) == 10
+    assert all(line.startswith(decoded) for line in summary)
+    assert summary == [line for line in full if line.startswith(decoded)]
+    # Off keeps only the start and end messages
+    assert trace_lines(make, TRACE_OFF) == []